@@ -1,65 +1,137 @@
 """Main entry point for GPGGA to CoT relay."""
 
 import asyncio
+import os
 import signal
 import sys
-from typing import Optional, Set
-import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from time import monotonic
+from types import ModuleType
+from typing import Awaitable, List, Optional, Tuple
 import structlog
 from prometheus_client import start_http_server
 
+uvloop: Optional[ModuleType]
+try:
+    import uvloop
+except ImportError:  # uvloop is not available on Windows
+    uvloop = None
+
 from .config import Settings
 from .logging_config import (
-    setup_logging, error_handler,
-    MESSAGES_RECEIVED, MESSAGES_PARSED, COT_CONVERSIONS,
-    COT_SENT, MESSAGE_PROCESSING_TIME, ACTIVE_DEVICES,
-    TAK_CONNECTION_STATUS
+    setup_logging, is_debug_enabled, error_handler, MetricsBuffer,
+    ACTIVE_DEVICES, TAK_CONNECTION_STATUS
 )
-from .gpgga_parser import GPGGAData
+from .gpgga_parser import COMPILED as PARSER_COMPILED, GPGGAData
 from .cot_converter import CoTConverter
 from .udp_listener import UDPListener
 from .tak_client_simple import SimpleTAKClient as TAKClient
 
 logger = structlog.get_logger(__name__)
 
+# Maximum number of queued messages processed before yielding to the event loop
+RX_BATCH_SIZE = 32
+
+# Record processing time for one in every N messages
+PROCESSING_TIME_SAMPLE_RATE = 100
+
+# Seconds between flushes of locally accumulated message counts to Prometheus
+METRICS_FLUSH_INTERVAL = 1.0
+
+# Active device tracking: maximum devices tracked, and seconds since a device
+# was last seen before it no longer counts as active
+ACTIVE_DEVICE_LIMIT = 10_000
+ACTIVE_DEVICE_TTL = 3600
+
+# Per-process converter used by the CPU worker pool (see settings.cpu_workers)
+_worker_converter: Optional[CoTConverter] = None
+
+
+def _init_cpu_worker(settings: Settings) -> None:
+    """Create the CoT converter in a CPU worker process."""
+    global _worker_converter
+    _worker_converter = CoTConverter(settings)
+
+
+def _convert_in_worker(gpgga_data: GPGGAData) -> Optional[bytes]:
+    """Convert GPGGA data to CoT XML in a CPU worker process."""
+    if _worker_converter is None:
+        raise RuntimeError("CPU worker used before _init_cpu_worker ran")
+    return _worker_converter.convert(gpgga_data)
+
 
 class GPGGACoTRelay:
     """Main application class for GPGGA to CoT relay."""
     
-    def __init__(self):
-        """Initialize the relay application."""
-        self.settings = Settings()
+    def __init__(self, settings: Settings):
+        """
+        Initialize the relay application.
+        
+        Args:
+            settings: Application settings
+        """
+        self.settings = settings
         self.cot_converter = CoTConverter(self.settings)
         self.udp_listener: Optional[UDPListener] = None
         self.tak_client: Optional[TAKClient] = None
         self._running = False
         self._shutdown_event = asyncio.Event()
-        self.active_devices: Set[str] = set()
-        self.last_device_cleanup = time.time()
+        # Device ID -> last seen (monotonic time), least recently seen first
+        self.active_devices: OrderedDict[str, float] = OrderedDict()
+        self._rx_queue: asyncio.Queue = asyncio.Queue(
+            maxsize=self.settings.message_queue_size
+        )
+        self._worker_tasks: List[asyncio.Task] = []
+        self._cpu_pool: Optional[ProcessPoolExecutor] = None
+        self._messages_handled = 0
+        # Message metrics accumulated since the last Prometheus flush
+        self._metrics = MetricsBuffer()
         
     async def start(self) -> None:
         """Start the relay application."""
         logger.info("Starting GPGGA to CoT Relay",
-                   config=self.settings.get_summary())
+                   config=self.settings.get_summary(),
+                   compiled_parser=PARSER_COMPILED)
+        if "udp_buffer_size" in self.settings.model_fields_set:
+            logger.warning("UDP_BUFFER_SIZE is deprecated and ignored - "
+                          "set UDP_SOCKET_RCVBUF instead",
+                          udp_socket_rcvbuf=self.settings.udp_socket_rcvbuf)
         
         # Initialize TAK client
-        self.tak_client = TAKClient(self.settings)
+        self.tak_client = TAKClient(self.settings, self._metrics)
         await self.tak_client.start()
         
+        # Start CPU worker pool for CoT conversion if configured
+        if self.settings.cpu_workers > 0:
+            self._cpu_pool = ProcessPoolExecutor(
+                max_workers=self.settings.cpu_workers,
+                initializer=_init_cpu_worker,
+                initargs=(self.settings,)
+            )
+        
         # Initialize UDP listener
+        self._running = True
+        
+        # Start the message workers before any datagrams can arrive
+        self._worker_tasks = [
+            asyncio.create_task(self._process_messages())
+            for _ in range(self.settings.rx_workers)
+        ]
+        
         self.udp_listener = UDPListener(
             self.settings,
-            self.handle_gpgga_message
+            self.enqueue_gpgga_message,
+            self._metrics
         )
         await self.udp_listener.start()
         
-        self._running = True
-        
         # Start background tasks
         asyncio.create_task(self._monitor_health())
-        asyncio.create_task(self._cleanup_devices())
+        asyncio.create_task(self._flush_metrics_periodically())
         
-        logger.info("GPGGA to CoT Relay started successfully")
+        logger.info("GPGGA to CoT Relay started successfully",
+                   event_loop=type(asyncio.get_running_loop()).__module__)
     
     async def stop(self) -> None:
         """Stop the relay application gracefully."""
@@ -72,41 +144,123 @@ class GPGGACoTRelay:
         if self.udp_listener:
             await self.udp_listener.stop()
         
+        # Stop message workers
+        for task in self._worker_tasks:
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        self._worker_tasks = []
+        
+        # Push any metrics not yet flushed
+        self._metrics.flush()
+        error_handler.flush_suppressed()
+        
+        # Stop CPU worker pool
+        if self._cpu_pool:
+            self._cpu_pool.shutdown(wait=False)
+            self._cpu_pool = None
+        
         # Stop TAK client
         if self.tak_client:
             await self.tak_client.stop()
         
         logger.info("GPGGA to CoT Relay stopped")
     
-    async def handle_gpgga_message(self, gpgga_data: GPGGAData, sender: tuple) -> None:
+    def enqueue_gpgga_message(self, gpgga_data: GPGGAData, sender: tuple) -> None:
+        """
+        Queue a parsed GPGGA message for processing.
+        
+        Called from the UDP datagram callback, so it must not block.
+        
+        Args:
+            gpgga_data: Parsed GPGGA data
+            sender: Sender address (host, port)
+        """
+        try:
+            self._rx_queue.put_nowait((gpgga_data, sender))
+        except asyncio.QueueFull:
+            self._metrics.count_drop("rx", "Receive queue full - dropping messages",
+                                     device_id=gpgga_data.device_id,
+                                     queue_size=self._rx_queue.qsize())
+    
+    async def _process_messages(self) -> None:
+        """Process queued GPGGA messages, draining up to RX_BATCH_SIZE per wakeup."""
+        queue = self._rx_queue
+        while True:
+            batch = [await queue.get()]
+            
+            # Drain whatever else is already queued before yielding
+            for _ in range(RX_BATCH_SIZE - 1):
+                try:
+                    batch.append(queue.get_nowait())
+                except asyncio.QueueEmpty:
+                    break
+            
+            await self._handle_batch(batch)
+            await asyncio.sleep(0)
+    
+    async def _handle_batch(self, batch: List[Tuple[GPGGAData, tuple]]) -> None:
+        """
+        Handle a batch of queued GPGGA messages in arrival order.
+        
+        With a CPU worker pool, the whole batch is submitted for conversion
+        up front so messages convert in parallel while still being sent in order.
+        """
+        if self._cpu_pool is None:
+            for gpgga_data, sender in batch:
+                await self.handle_gpgga_message(gpgga_data, sender)
+            return
+        
+        loop = asyncio.get_running_loop()
+        conversions = [
+            loop.run_in_executor(self._cpu_pool, _convert_in_worker, gpgga_data)
+            for gpgga_data, _ in batch
+        ]
+        for (gpgga_data, sender), conversion in zip(batch, conversions):
+            await self.handle_gpgga_message(gpgga_data, sender, conversion)
+    
+    async def handle_gpgga_message(self, gpgga_data: GPGGAData, sender: tuple,
+                                   conversion: Optional[Awaitable[Optional[bytes]]] = None) -> None:
         """
         Handle a parsed GPGGA message.
         
         Args:
             gpgga_data: Parsed GPGGA data
             sender: Sender address (host, port)
+            conversion: Pending CoT conversion from the CPU worker pool;
+                converted in-process when not given
         """
-        start_time = time.time()
+        # Only a sample of messages is timed to keep histogram updates cheap
+        self._messages_handled += 1
+        timed = self._messages_handled % PROCESSING_TIME_SAMPLE_RATE == 0
+        start_time = monotonic() if timed else 0.0
+        metrics = self._metrics
         
         try:
-            # Update metrics
-            MESSAGES_RECEIVED.inc()
-            MESSAGES_PARSED.inc()
+            # Update metrics (flushed to Prometheus periodically)
+            metrics.received += 1
             
             # Track active device
-            self.active_devices.add(gpgga_data.device_id)
+            self._track_device(gpgga_data.device_id)
             
-            logger.info("Processing GPGGA message",
-                       device_id=gpgga_data.device_id,
-                       lat=gpgga_data.latitude,
-                       lon=gpgga_data.longitude,
-                       alt=gpgga_data.altitude,
-                       fix_quality=gpgga_data.fix_quality_description,
-                       satellites=gpgga_data.num_satellites,
-                       sender=sender)
+            debug = is_debug_enabled()
+            if debug:
+                logger.debug("Processing GPGGA message",
+                            device_id=gpgga_data.device_id,
+                            lat=gpgga_data.latitude,
+                            lon=gpgga_data.longitude,
+                            alt=gpgga_data.altitude,
+                            fix_quality=gpgga_data.fix_quality_description,
+                            satellites=gpgga_data.num_satellites,
+                            sender=sender)
             
             # Convert to CoT
-            cot_xml = self.cot_converter.convert(gpgga_data)
+            if conversion is not None:
+                cot_xml = await conversion
+            else:
+                cot_xml = self.cot_converter.convert(gpgga_data)
             
             if not cot_xml:
                 error_handler.handle_conversion_error(
@@ -115,16 +269,17 @@ class GPGGACoTRelay:
                 )
                 return
             
-            COT_CONVERSIONS.inc()
+            metrics.converted += 1
             
             # Send to TAK
             if self.tak_client and self.tak_client.is_connected():
+                # Sent/failed writes are counted by the client's sender
                 success = await self.tak_client.send_cot(cot_xml)
                 
                 if success:
-                    COT_SENT.inc()
-                    logger.debug("CoT sent successfully",
-                               device_id=gpgga_data.device_id)
+                    if debug:
+                        logger.debug("CoT queued for sending",
+                                   device_id=gpgga_data.device_id)
                 else:
                     error_handler.handle_send_error(
                         gpgga_data.device_id,
@@ -135,8 +290,8 @@ class GPGGACoTRelay:
                              device_id=gpgga_data.device_id)
             
             # Record processing time
-            processing_time = time.time() - start_time
-            MESSAGE_PROCESSING_TIME.observe(processing_time)
+            if timed:
+                metrics.latencies.append(monotonic() - start_time)
             
         except Exception as e:
             logger.error("Error processing GPGGA message",
@@ -147,6 +302,7 @@ class GPGGACoTRelay:
     
     async def _monitor_health(self) -> None:
         """Monitor application health and update metrics."""
+        interval = self.settings.health_check_interval
         while self._running:
             try:
                 # Update connection status
@@ -156,6 +312,7 @@ class GPGGACoTRelay:
                     )
                 
                 # Update active devices count
+                self._expire_devices()
                 ACTIVE_DEVICES.set(len(self.active_devices))
                 
                 # Log statistics
@@ -170,27 +327,37 @@ class GPGGACoTRelay:
                     logger.info("Application statistics", **stats)
                 
                 # Wait for next check
-                await asyncio.sleep(self.settings.health_check_interval)
+                await asyncio.sleep(interval)
                 
             except Exception as e:
                 logger.error("Error in health monitor", error=str(e))
                 await asyncio.sleep(10)
     
-    async def _cleanup_devices(self) -> None:
-        """Periodically clean up inactive devices."""
+    async def _flush_metrics_periodically(self) -> None:
+        """Flush message metrics to Prometheus every METRICS_FLUSH_INTERVAL seconds."""
         while self._running:
-            try:
-                # Clear device list every hour
-                await asyncio.sleep(3600)
-                
-                old_count = len(self.active_devices)
-                self.active_devices.clear()
-                
-                logger.info("Cleared active device list",
-                          old_count=old_count)
-                
-            except Exception as e:
-                logger.error("Error in device cleanup", error=str(e))
+            await asyncio.sleep(METRICS_FLUSH_INTERVAL)
+            self._metrics.flush()
+            error_handler.flush_suppressed()
+    
+    def _track_device(self, device_id: str) -> None:
+        """Mark a device as seen, evicting the least recently seen one if full."""
+        devices = self.active_devices
+        if device_id in devices:
+            devices.move_to_end(device_id)
+        elif len(devices) >= ACTIVE_DEVICE_LIMIT:
+            devices.popitem(last=False)
+        devices[device_id] = monotonic()
+    
+    def _expire_devices(self) -> None:
+        """Drop devices not seen within ACTIVE_DEVICE_TTL."""
+        devices = self.active_devices
+        cutoff = monotonic() - ACTIVE_DEVICE_TTL
+        while devices:
+            device_id, last_seen = next(iter(devices.items()))
+            if last_seen >= cutoff:
+                break
+            devices.popitem(last=False)
     
     async def run(self) -> None:
         """Run the application until shutdown."""
@@ -212,10 +379,16 @@ def setup_signal_handlers(app: GPGGACoTRelay) -> None:
     signal.signal(signal.SIGTERM, signal_handler)
 
 
-async def main():
-    """Main entry point."""
+async def main(settings: Optional[Settings] = None):
+    """
+    Main entry point.
+    
+    Args:
+        settings: Application settings; loaded from the environment if not given
+    """
     # Load settings
-    settings = Settings()
+    if settings is None:
+        settings = Settings()
     
     # Set up logging
     setup_logging(settings)
@@ -227,7 +400,7 @@ async def main():
                    port=settings.metrics_port)
     
     # Create and run application
-    app = GPGGACoTRelay()
+    app = GPGGACoTRelay(settings)
     
     # Set up signal handlers
     setup_signal_handlers(app)
@@ -239,5 +412,66 @@ async def main():
         sys.exit(1)
 
 
+def _run_loop(settings: Settings) -> None:
+    """Run the relay on uvloop when available and enabled, else the default event loop."""
+    if uvloop is None or not settings.use_uvloop:
+        asyncio.run(main(settings))
+    elif sys.version_info >= (3, 12):
+        asyncio.run(main(settings), loop_factory=uvloop.new_event_loop)
+    else:
+        uvloop.install()
+        asyncio.run(main(settings))
+
+
+def _run_sharded(settings: Settings) -> None:
+    """
+    Fork one relay process per UDP worker, all bound to the same UDP port.
+    
+    SO_REUSEPORT lets the kernel spread datagrams across the processes by
+    sender address. Each child serves metrics on metrics_port + its index.
+    The parent only forwards shutdown signals and waits for the children.
+    
+    Args:
+        settings: Application settings
+    """
+    children: List[int] = []
+    for index in range(settings.udp_workers):
+        pid = os.fork()
+        if pid == 0:
+            structlog.contextvars.bind_contextvars(udp_worker=index)
+            _run_loop(settings.model_copy(
+                update={"metrics_port": settings.metrics_port + index}
+            ))
+            sys.exit(0)
+        children.append(pid)
+    
+    def forward_signal(sig, frame):
+        for child in children:
+            try:
+                os.kill(child, sig)
+            except ProcessLookupError:
+                pass
+    
+    signal.signal(signal.SIGINT, forward_signal)
+    signal.signal(signal.SIGTERM, forward_signal)
+    
+    exit_code = 0
+    for child in children:
+        _, status = os.waitpid(child, 0)
+        if status != 0:
+            exit_code = 1
+    sys.exit(exit_code)
+
+
+def run() -> None:
+    """Run the relay, sharded across UDP worker processes if configured."""
+    settings = Settings()
+    
+    if settings.udp_workers > 1 and hasattr(os, 'fork'):
+        _run_sharded(settings)
+    else:
+        _run_loop(settings)
+
+
 if __name__ == "__main__":
-    asyncio.run(main())
+    run()
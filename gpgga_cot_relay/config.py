@@ -30,7 +30,23 @@ class Settings(BaseSettings):
         default=1024,
         ge=256,
         le=65536,
-        description="UDP receive buffer size in bytes"
+        description="Deprecated and ignored; use udp_socket_rcvbuf"
+    )
+    udp_socket_rcvbuf: int = Field(
+        default=12_582_912,
+        ge=65536,
+        le=134_217_728,
+        description="Kernel socket receive buffer (SO_RCVBUF) for the UDP listener in bytes"
+    )
+    udp_batch_size: int = Field(
+        default=32,
+        ge=1,
+        le=1024,
+        description="Maximum datagrams read per event loop tick before yielding"
+    )
+    udp_threaded_receive: bool = Field(
+        default=False,
+        description="Read the UDP socket from a dedicated thread instead of the event loop"
     )
     
     # TAK Server Configuration
@@ -44,6 +60,12 @@ class Settings(BaseSettings):
         le=300,
         description="Seconds between TAK reconnection attempts"
     )
+    tak_send_batch_size: int = Field(
+        default=64,
+        ge=1,
+        le=1000,
+        description="Maximum CoT messages written to the TAK server per socket write"
+    )
     tak_send_timeout: float = Field(
         default=5.0,
         ge=0.1,
@@ -116,6 +138,28 @@ class Settings(BaseSettings):
         le=10000,
         description="Size of internal message queue"
     )
+    cpu_workers: int = Field(
+        default=0,
+        ge=0,
+        le=64,
+        description="Worker processes for CoT conversion (0 = convert in the event loop)"
+    )
+    rx_workers: int = Field(
+        default=1,
+        ge=1,
+        le=64,
+        description="Coroutines consuming the receive queue (1 keeps strict arrival order)"
+    )
+    udp_workers: int = Field(
+        default=1,
+        ge=1,
+        le=64,
+        description="Relay processes sharing the UDP port via SO_REUSEPORT (POSIX only)"
+    )
+    use_uvloop: bool = Field(
+        default=True,
+        description="Run on the uvloop event loop when it is installed"
+    )
     
     # Health Check Configuration
     health_check_interval: int = Field(
@@ -181,10 +225,18 @@ class Settings(BaseSettings):
         """Get configuration summary for logging."""
         return {
             "udp_listener": f"{self.udp_listen_host}:{self.udp_listen_port}",
+            "udp_rcvbuf": self.udp_socket_rcvbuf,
+            # Kernel limits needed for the receive buffer above to take effect
+            "udp_sysctl_hint": (
+                f"net.core.rmem_max={self.udp_socket_rcvbuf} "
+                "net.core.netdev_max_backlog=5000"
+            ),
             "tak_server": self.tak_server_url,
             "tls_enabled": self.is_tls_enabled,
             "device_type": self.device_type,
             "stale_time": self.stale_time_seconds,
             "log_level": self.log_level,
+            "use_uvloop": self.use_uvloop,
+            "udp_workers": self.udp_workers,
             "metrics": f"port {self.metrics_port}" if self.metrics_enabled else "disabled"
         }
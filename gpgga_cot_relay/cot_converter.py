@@ -1,9 +1,10 @@
 """Cursor on Target (CoT) converter for GPGGA data."""
 
+import hashlib
+import time
 import uuid
-import xml.etree.ElementTree as ET
-from datetime import datetime, timedelta, timezone
-from typing import Optional, Dict, Any
+from xml.sax.saxutils import escape
+from typing import Optional, Dict, Any, Tuple
 import structlog
 
 from .gpgga_parser import GPGGAData
@@ -11,6 +12,87 @@ from .config import Settings
 
 logger = structlog.get_logger(__name__)
 
+# CoT event template; "le" (linear error) is the same as "ce" for GPS and
+# "hae" is height above ellipsoid
+_COT_TEMPLATE = (
+    '<event version="2.0" uid="{uid}" type="{type}" time="{time}" '
+    'start="{time}" stale="{stale}" how="{how}">'
+    '<point lat="{lat}" lon="{lon}" hae="{hae}" ce="{ce}" le="{ce}" />'
+    '<detail>'
+    '<contact callsign="{callsign}" />'
+    '<precisionlocation altsrc="GPS" geopointsrc="GPS" />'
+    '{track}'
+    '<__gps numSats="{numsats}" hdop="{hdop}" fixQuality="{fq}" fixQualityDesc="{fqd}" />'
+    '<__device uid="{devid}" type="GPS Tracker" />'
+    '<remarks>{remarks}</remarks>'
+    '</detail>'
+    '</event>\n'
+)
+
+# Track element, only included with a valid fix (GPGGA has no course/speed)
+_COT_TRACK = '<track course="0.0" speed="0.0" />'
+
+# CoT 'how' attribute, indexed by GPS fix quality (0-8)
+_HOW = (
+    "h-g-i-g-o",  # Invalid - no GPS
+    "h-gps",      # Standard GPS
+    "h-dgps",     # Differential GPS
+    "h-pps",      # PPS fix
+    "h-rtk",      # RTK
+    "h-rtk",      # Float RTK
+    "h-e",        # Estimated
+    "h-m",        # Manual
+    "h-s",        # Simulation
+)
+
+# Base error estimates in meters, indexed by GPS fix quality (0-8)
+_BASE_ERR = (
+    9999.0,  # Invalid
+    5.0,     # GPS
+    2.0,     # DGPS
+    1.0,     # PPS
+    0.1,     # RTK
+    0.5,     # Float RTK
+    10.0,    # Estimated
+    50.0,    # Manual
+    100.0,   # Simulation
+)
+
+# SHA-1 state seeded with the URL namespace UUID, copied per device to derive
+# UUID5 device UIDs without rehashing the namespace
+_NS_SHA = hashlib.sha1(uuid.UUID('6ba7b810-9dad-11d1-80b4-00c04fd430c8').bytes)
+
+# Extra entities needed to escape text inside a double-quoted attribute
+_ATTR_ENTITIES = {'"': "&quot;", "\n": "&#10;", "\r": "&#13;", "\t": "&#09;"}
+
+# Formatted CoT timestamps are reused for messages converted within this window
+TIMESTAMP_CACHE_SECONDS = 0.01
+
+
+def _format_cot_time(timestamp: float) -> str:
+    """
+    Format a Unix timestamp as a CoT time string (YYYY-MM-DDTHH:MM:SS.ffffffZ).
+    
+    Equivalent to strftime("%Y-%m-%dT%H:%M:%S.%fZ") on a UTC datetime, but
+    without going through the strftime format parser.
+    """
+    seconds = int(timestamp)
+    microseconds = round((timestamp - seconds) * 1000000)
+    if microseconds >= 1000000:
+        seconds += 1
+        microseconds -= 1000000
+    tm = time.gmtime(seconds)
+    return "%04d-%02d-%02dT%02d:%02d:%02d.%06dZ" % (
+        tm.tm_year, tm.tm_mon, tm.tm_mday,
+        tm.tm_hour, tm.tm_min, tm.tm_sec,
+        microseconds
+    )
+
+
+def _escape_attr(value: str) -> str:
+    """Escape a string for use inside a double-quoted XML attribute."""
+    return escape(value, _ATTR_ENTITIES)
+
 
 class CoTConverter:
     """Convert GPGGA data to Cursor on Target (CoT) format."""
@@ -23,9 +105,20 @@ class CoTConverter:
             settings: Application settings
         """
         self.settings = settings
-        self.device_uids: Dict[str, str] = {}  # Cache device IDs to UIDs
         
-    def convert(self, gpgga_data: GPGGAData) -> Optional[str]:
+        # Settings used on every conversion, bound once
+        self._stale_seconds = settings.stale_time_seconds
+        self._device_type = settings.device_type
+        # Template with the (escaped) device type already filled in
+        self._template = _COT_TEMPLATE.replace(
+            "{type}",
+            _escape_attr(self._device_type).replace("{", "{{").replace("}", "}}")
+        )
+        
+        self.device_uids: Dict[str, Tuple[str, str]] = {}  # Cache device IDs to (UID, escaped ID)
+        self._ts_cache: Tuple[float, str, str] = (0.0, "", "")  # (time, time_str, stale_str)
+        
+    def convert(self, gpgga_data: GPGGAData) -> Optional[bytes]:
         """
         Convert GPGGA data to CoT XML format.
         
@@ -33,80 +126,43 @@ class CoTConverter:
             gpgga_data: Parsed GPGGA data
             
         Returns:
-            CoT XML string or None if conversion fails
+            Newline-terminated UTF-8 CoT XML, ready to write to the TAK
+            stream as-is, or None if conversion fails
         """
         try:
-            # Get or create UID for device
-            uid = self._get_device_uid(gpgga_data.device_id)
-            
-            # Create current timestamp
-            now = datetime.now(timezone.utc)
-            time_str = now.strftime("%Y-%m-%dT%H:%M:%S.%fZ")
-            
-            # Calculate stale time
-            stale_time = now + timedelta(seconds=self.settings.stale_time_seconds)
-            stale_str = stale_time.strftime("%Y-%m-%dT%H:%M:%S.%fZ")
+            # Get or create UID (and escaped device ID) for device
+            uid, device_id = self._get_device_uid(gpgga_data.device_id)
             
-            # Create CoT event element
-            event = ET.Element("event")
-            event.set("version", "2.0")
-            event.set("uid", uid)
-            event.set("type", self.settings.device_type)
-            event.set("time", time_str)
-            event.set("start", time_str)
-            event.set("stale", stale_str)
-            event.set("how", self._get_how_attribute(gpgga_data))
-            
-            # Add point element
-            point = ET.SubElement(event, "point")
-            point.set("lat", str(gpgga_data.latitude))
-            point.set("lon", str(gpgga_data.longitude))
-            point.set("hae", str(gpgga_data.altitude))  # Height above ellipsoid
+            # Current and stale timestamps
+            time_str, stale_str = self._get_timestamps()
             
             # Set circular error based on fix quality and HDOP
-            ce = self._calculate_circular_error(gpgga_data)
-            point.set("ce", str(ce))
-            point.set("le", str(ce))  # Linear error same as circular for GPS
-            
-            # Add detail element
-            detail = ET.SubElement(event, "detail")
-            
-            # Add contact information
-            contact = ET.SubElement(detail, "contact")
-            contact.set("callsign", gpgga_data.device_id)
-            
-            # Add precision location information
-            precisionlocation = ET.SubElement(detail, "precisionlocation")
-            precisionlocation.set("altsrc", "GPS")
-            precisionlocation.set("geopointsrc", "GPS")
-            
-            # Add track information if we have valid GPS data
-            if gpgga_data.has_valid_fix:
-                track = ET.SubElement(detail, "track")
-                track.set("course", "0.0")  # We don't have course from GPGGA
-                track.set("speed", "0.0")   # We don't have speed from GPGGA
-                
-            # Add GPS status information
-            gps_status = ET.SubElement(detail, "__gps")
-            gps_status.set("numSats", str(gpgga_data.num_satellites))
-            gps_status.set("hdop", str(gpgga_data.hdop))
-            gps_status.set("fixQuality", str(gpgga_data.fix_quality))
-            gps_status.set("fixQualityDesc", gpgga_data.fix_quality_description)
-            
-            # Add device info
-            device_info = ET.SubElement(detail, "__device")
-            device_info.set("uid", gpgga_data.device_id)
-            device_info.set("type", "GPS Tracker")
+            ce = str(self._calculate_circular_error(gpgga_data))
             
             # Add remarks with additional info
-            remarks = ET.SubElement(detail, "remarks")
-            remarks_text = f"GPGGA Device: {gpgga_data.device_id}"
+            remarks_text = f"GPGGA Device: {device_id}"
             if gpgga_data.timestamp:
                 remarks_text += f", GPS Time: {gpgga_data.timestamp.isoformat()}"
-            remarks.text = remarks_text
             
-            # Convert to XML string
-            xml_str = ET.tostring(event, encoding='unicode', method='xml')
+            # Render the CoT XML
+            xml_str = self._template.format(
+                uid=uid,
+                time=time_str,
+                stale=stale_str,
+                how=self._get_how_attribute(gpgga_data),
+                lat=gpgga_data.latitude,
+                lon=gpgga_data.longitude,
+                hae=gpgga_data.altitude,
+                ce=ce,
+                callsign=device_id,
+                track=_COT_TRACK if gpgga_data.has_valid_fix else "",
+                numsats=gpgga_data.num_satellites,
+                hdop=gpgga_data.hdop,
+                fq=gpgga_data.fix_quality,
+                fqd=gpgga_data.fix_quality_description,
+                devid=device_id,
+                remarks=remarks_text
+            )
             
             logger.debug("Converted GPGGA to CoT",
                         device_id=gpgga_data.device_id,
@@ -115,7 +171,7 @@ class CoTConverter:
                         lon=gpgga_data.longitude,
                         alt=gpgga_data.altitude)
             
-            return xml_str
+            return xml_str.encode('utf-8')
             
         except Exception as e:
             logger.error("Failed to convert GPGGA to CoT",
@@ -123,26 +179,52 @@ class CoTConverter:
                         error=str(e))
             return None
     
-    def _get_device_uid(self, device_id: str) -> str:
+    def _get_timestamps(self) -> Tuple[str, str]:
+        """
+        Get the formatted current and stale CoT timestamps.
+        
+        Strings are cached and reused for TIMESTAMP_CACHE_SECONDS so bursts
+        of messages don't each pay for formatting.
+        
+        Returns:
+            Tuple of (time_str, stale_str)
+        """
+        now = time.time()
+        cached_at, time_str, stale_str = self._ts_cache
+        if 0.0 <= now - cached_at < TIMESTAMP_CACHE_SECONDS:
+            return time_str, stale_str
+        
+        time_str = _format_cot_time(now)
+        stale_str = _format_cot_time(now + self._stale_seconds)
+        self._ts_cache = (now, time_str, stale_str)
+        return time_str, stale_str
+    
+    def _get_device_uid(self, device_id: str) -> Tuple[str, str]:
         """
         Get or create a persistent UID for a device.
         
+        The XML-escaped device ID is cached alongside the UID so it is only
+        escaped once per device.
+        
         Args:
             device_id: Device identifier from GPGGA
             
         Returns:
-            CoT UID for the device
+            Tuple of (CoT UID, XML-escaped device ID)
         """
-        if device_id not in self.device_uids:
-            # Create a deterministic UUID based on device ID
-            namespace = uuid.UUID('6ba7b810-9dad-11d1-80b4-00c04fd430c8')  # URL namespace
-            device_uuid = uuid.uuid5(namespace, f"gpgga-device-{device_id}")
-            self.device_uids[device_id] = f"GPGGA-{device_uuid}"
+        entry = self.device_uids.get(device_id)
+        if entry is None:
+            # Create a deterministic UUID5 (URL namespace) based on device ID
+            sha = _NS_SHA.copy()
+            sha.update(f"gpgga-device-{device_id}".encode('utf-8'))
+            device_uuid = uuid.UUID(bytes=sha.digest()[:16], version=5)
+            entry = (f"GPGGA-{device_uuid}", _escape_attr(device_id))
+            self.device_uids[device_id] = entry
             logger.info("Created new UID for device",
                        device_id=device_id,
-                       uid=self.device_uids[device_id])
+                       uid=entry[0])
         
-        return self.device_uids[device_id]
+        return entry
     
     def _get_how_attribute(self, gpgga_data: GPGGAData) -> str:
         """
@@ -154,20 +236,8 @@ class CoTConverter:
         Returns:
             CoT 'how' attribute value
         """
-        # Map fix quality to CoT 'how' attribute
-        how_mapping = {
-            0: "h-g-i-g-o",  # Invalid - no GPS
-            1: "h-gps",       # Standard GPS
-            2: "h-dgps",      # Differential GPS
-            3: "h-pps",       # PPS fix
-            4: "h-rtk",       # RTK
-            5: "h-rtk",       # Float RTK
-            6: "h-e",         # Estimated
-            7: "h-m",         # Manual
-            8: "h-s"          # Simulation
-        }
-        
-        return how_mapping.get(gpgga_data.fix_quality, "h-gps")
+        fix_quality = gpgga_data.fix_quality
+        return _HOW[fix_quality] if 0 <= fix_quality < 9 else "h-gps"
     
     def _calculate_circular_error(self, gpgga_data: GPGGAData) -> float:
         """
@@ -179,20 +249,8 @@ class CoTConverter:
         Returns:
             Circular error in meters
         """
-        # Base error estimates for different fix qualities (meters)
-        base_errors = {
-            0: 9999.0,  # Invalid
-            1: 5.0,     # GPS
-            2: 2.0,     # DGPS
-            3: 1.0,     # PPS
-            4: 0.1,     # RTK
-            5: 0.5,     # Float RTK
-            6: 10.0,    # Estimated
-            7: 50.0,    # Manual
-            8: 100.0    # Simulation
-        }
-        
-        base_error = base_errors.get(gpgga_data.fix_quality, 10.0)
+        fix_quality = gpgga_data.fix_quality
+        base_error = _BASE_ERR[fix_quality] if 0 <= fix_quality < 9 else 10.0
         
         # Apply HDOP factor (typically HDOP * 5m for standard GPS)
         if gpgga_data.hdop > 0:
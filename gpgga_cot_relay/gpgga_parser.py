@@ -1,40 +1,54 @@
 """GPGGA sentence parser with device ID extraction."""
 
-import re
-from typing import Optional
-from datetime import datetime, time
-from pydantic import BaseModel, Field, validator
+from typing import ClassVar, NamedTuple, Optional
+from datetime import time
+from math import isfinite
 import structlog
 
 logger = structlog.get_logger(__name__)
 
+# True when this module was built as a native extension (see setup.py)
+COMPILED = not __file__.endswith(".py")
 
-class GPGGAData(BaseModel):
-    """Parsed GPGGA data model."""
-    
-    timestamp: Optional[time] = Field(None, description="UTC time from GPS")
-    latitude: float = Field(..., description="Latitude in decimal degrees")
-    longitude: float = Field(..., description="Longitude in decimal degrees")
-    fix_quality: int = Field(..., description="GPS fix quality (0-8)")
-    num_satellites: int = Field(..., description="Number of satellites in use")
-    hdop: float = Field(..., description="Horizontal dilution of precision")
-    altitude: float = Field(..., description="Altitude above mean sea level in meters")
-    geoid_separation: Optional[float] = Field(None, description="Geoid separation in meters")
-    dgps_time: Optional[float] = Field(None, description="Time since last DGPS update")
-    dgps_station_id: Optional[str] = Field(None, description="DGPS station ID")
-    device_id: str = Field(..., description="Device identifier")
+
+# Characters allowed in unsigned / signed decimal fields. float() alone would
+# also take "nan", "inf", "1e2" and "1_000.5"
+_UNSIGNED_CHARS = b'0123456789.'
+_DECIMAL_CHARS = b'0123456789.-'
+
+# Human-readable fix quality descriptions, indexed by fix quality (0-8)
+_FIX_DESC = (
+    "Invalid",
+    "GPS fix",
+    "DGPS fix",
+    "PPS fix",
+    "Real Time Kinematic",
+    "Float RTK",
+    "Estimated",
+    "Manual input",
+    "Simulation",
+)
+
+
+class GPGGAData(NamedTuple):
+    """
+    Parsed GPGGA data.
     
-    @validator("fix_quality")
-    def validate_fix_quality(cls, v):
-        if not 0 <= v <= 8:
-            raise ValueError(f"Fix quality must be between 0 and 8, got {v}")
-        return v
+    A plain immutable record: values are validated by GPGGAParser, so
+    construction on the per-packet path does no further checking.
+    """
     
-    @validator("num_satellites")
-    def validate_num_satellites(cls, v):
-        if v < 0:
-            raise ValueError(f"Number of satellites cannot be negative, got {v}")
-        return v
+    timestamp: Optional[time]            # UTC time from GPS
+    latitude: float                      # Latitude in decimal degrees
+    longitude: float                     # Longitude in decimal degrees
+    fix_quality: int                     # GPS fix quality (0-8)
+    num_satellites: int                  # Number of satellites in use
+    hdop: float                          # Horizontal dilution of precision
+    altitude: float                      # Altitude above mean sea level in meters
+    geoid_separation: Optional[float]    # Geoid separation in meters
+    dgps_time: Optional[float]           # Time since last DGPS update
+    dgps_station_id: Optional[str]       # DGPS station ID
+    device_id: str                       # Device identifier
     
     @property
     def has_valid_fix(self) -> bool:
@@ -44,51 +58,48 @@ class GPGGAData(BaseModel):
     @property
     def fix_quality_description(self) -> str:
         """Get human-readable fix quality description."""
-        descriptions = {
-            0: "Invalid",
-            1: "GPS fix",
-            2: "DGPS fix",
-            3: "PPS fix",
-            4: "Real Time Kinematic",
-            5: "Float RTK",
-            6: "Estimated",
-            7: "Manual input",
-            8: "Simulation"
-        }
-        return descriptions.get(self.fix_quality, "Unknown")
+        fix_quality = self.fix_quality
+        return _FIX_DESC[fix_quality] if 0 <= fix_quality < 9 else "Unknown"
+
+
+def _for_log(value: bytes) -> str:
+    """Decode raw sentence bytes for logging."""
+    return value.decode('ascii', 'replace')
+
+
+def _is_decimal(value: bytes) -> bool:
+    """Check for a digits.digits field (NMEA latitude/longitude)."""
+    whole, dot, frac = value.partition(b'.')
+    return bool(dot) and whole.isdigit() and frac.isdigit()
+
+
+def _is_time(value: bytes) -> bool:
+    """Check for an empty or hhmmss[.ss] time field."""
+    if not value:
+        return True
+    whole, dot, frac = value.partition(b'.')
+    return (len(whole) == 6 and whole.isdigit()
+            and (not dot or frac.isdigit()))
 
 
 class GPGGAParser:
     """Parser for NMEA GPGGA sentences with custom device ID support."""
     
-    # GPGGA sentence pattern with device ID before checksum
-    GPGGA_PATTERN = re.compile(
-        r'^\$GPGGA,'
-        r'(\d{6}(?:\.\d+)?)?,'          # Time (HHMMSS.sss)
-        r'(\d+\.\d+),'                   # Latitude (DDMM.mmmm or DDDMM.mmmm)
-        r'([NS]),'                       # Latitude direction
-        r'(\d+\.\d+),'                   # Longitude (DDDMM.mmmm or DDMM.mmmm)
-        r'([EW]),'                       # Longitude direction
-        r'([0-8]),'                      # Fix quality
-        r'(\d+),'                        # Number of satellites
-        r'(\d*\.?\d+)?,'                 # HDOP (can be like 0.9, 1.2, or even just 1)
-        r'(-?\d+\.?\d*),'                # Altitude
-        r'M,'                            # Altitude units (always M)
-        r'(-?\d+\.?\d*)?,'               # Geoid separation
-        r'M?,'                           # Geoid units
-        r'([^,]*)?,'                     # DGPS time (can be empty)
-        r'([^,]*)?,'                     # DGPS station ID (can be empty)
-        r'([^*]+)'                       # Device ID (custom field)
-        r'\*([0-9A-F]{2})$'              # Checksum
-    )
+    # Number of comma-separated fields in a GPGGA sentence with device ID
+    # (sentence ID, 14 standard fields, custom device ID)
+    GPGGA_FIELD_COUNT: ClassVar[int] = 16
     
     @classmethod
-    def parse(cls, sentence: str) -> Optional[GPGGAData]:
+    def parse(cls, sentence: bytes) -> Optional[GPGGAData]:
         """
         Parse a GPGGA sentence with device ID.
         
+        NMEA is 7-bit ASCII, so the sentence is parsed as raw bytes; only the
+        text fields kept in GPGGAData are decoded. Anything with non-ASCII
+        bytes is rejected up front by a single C-level isascii() scan.
+        
         Args:
-            sentence: Raw GPGGA sentence string
+            sentence: Raw GPGGA sentence bytes
             
         Returns:
             Parsed GPGGAData or None if parsing fails
@@ -97,23 +108,56 @@ class GPGGAParser:
             # Strip whitespace and validate basic format
             sentence = sentence.strip()
             
+            # Split off the checksum: $<body>*<checksum>
+            body, sep, checksum = sentence[1:].rpartition(b'*')
+            if (not sentence.startswith(b'$') or not sep or b'*' in body
+                    or not sentence.isascii()):
+                logger.warning("Invalid GPGGA format", sentence=_for_log(sentence))
+                return None
+            
             # Verify checksum
-            if not cls._verify_checksum(sentence):
-                logger.warning("Invalid GPGGA checksum", sentence=sentence)
+            if not cls._verify_checksum(body, checksum):
+                logger.warning("Invalid GPGGA checksum", sentence=_for_log(sentence))
+                return None
+            
+            # Positional field extraction
+            fields = body.split(b',')
+            if len(fields) != cls.GPGGA_FIELD_COUNT or fields[0] != b'GPGGA':
+                logger.warning("Invalid GPGGA format", 
+                              sentence=_for_log(sentence),
+                              sentence_parts=_for_log(body).split(','))
                 return None
             
-            # Match the pattern
-            match = cls.GPGGA_PATTERN.match(sentence)
-            if not match:
+            (_, time_str, lat_str, lat_dir, lon_str, lon_dir, fix_str,
+             sats_str, hdop, altitude, alt_unit, geoid_sep, geoid_unit,
+             dgps_time, dgps_station, device_field) = fields
+            
+            if (lat_dir not in (b'N', b'S') or lon_dir not in (b'E', b'W')
+                    or alt_unit != b'M' or geoid_unit not in (b'M', b'')
+                    or not fix_str.isdigit() or not sats_str.isdigit()
+                    or not _is_time(time_str)
+                    or not _is_decimal(lat_str) or not _is_decimal(lon_str)
+                    or hdop.translate(None, _UNSIGNED_CHARS)
+                    or (altitude + geoid_sep + dgps_time).translate(None, _DECIMAL_CHARS)):
                 logger.warning("Invalid GPGGA format", 
-                              sentence=sentence,
-                              sentence_parts=sentence.split(','))
+                              sentence=_for_log(sentence),
+                              sentence_parts=_for_log(body).split(','))
+                return None
+            
+            device_id = device_field.strip().decode('ascii')
+            if not device_id:
+                logger.warning("Missing device ID in GPGGA sentence",
+                              sentence=_for_log(sentence))
                 return None
             
-            # Extract groups
-            (time_str, lat_str, lat_dir, lon_str, lon_dir, fix_quality,
-             num_sats, hdop, altitude, geoid_sep, dgps_time, dgps_station,
-             device_id, checksum) = match.groups()
+            fix_quality = int(fix_str)
+            num_sats = int(sats_str)
+            if not 0 <= fix_quality <= 8 or num_sats < 0:
+                logger.warning("Invalid GPGGA fix data",
+                              sentence=_for_log(sentence),
+                              fix_quality=fix_quality,
+                              num_satellites=num_sats)
+                return None
             
             # Parse time
             timestamp = None
@@ -123,84 +167,100 @@ class GPGGAParser:
                     minutes = int(time_str[2:4])
                     seconds = int(time_str[4:6])
                     microseconds = 0
-                    if '.' in time_str:
-                        frac = float('0.' + time_str.split('.')[1])
+                    if b'.' in time_str:
+                        frac = float(b'0.' + time_str.split(b'.')[1])
                         microseconds = int(frac * 1000000)
                     timestamp = time(hours, minutes, seconds, microseconds)
                 except ValueError:
-                    logger.warning("Invalid time format", time_str=time_str)
+                    logger.warning("Invalid time format", time_str=_for_log(time_str))
             
             # Parse coordinates
-            latitude = cls._parse_coordinate(lat_str, lat_dir in 'S')
-            longitude = cls._parse_coordinate(lon_str, lon_dir in 'W')
+            latitude = cls._parse_coordinate(lat_str, lat_dir == b'S')
+            longitude = cls._parse_coordinate(lon_str, lon_dir == b'W')
+            hdop_value = float(hdop) if hdop else 0.0
+            alt_value = float(altitude)
+            
+            # Overlong digit strings still overflow to inf
+            if not (isfinite(latitude) and isfinite(longitude)
+                    and isfinite(hdop_value) and isfinite(alt_value)
+                    and abs(latitude) <= 90.0 and abs(longitude) <= 180.0):
+                logger.warning("Invalid GPGGA numeric value",
+                              sentence=_for_log(sentence))
+                return None
             
             # Create data object
             return GPGGAData(
-                timestamp=timestamp,
-                latitude=latitude,
-                longitude=longitude,
-                fix_quality=int(fix_quality),
-                num_satellites=int(num_sats),
-                hdop=float(hdop) if hdop and hdop.strip() else 0.0,
-                altitude=float(altitude),
-                geoid_separation=float(geoid_sep) if geoid_sep and geoid_sep.strip() else None,
-                dgps_time=float(dgps_time) if dgps_time and dgps_time.strip() else None,
-                dgps_station_id=dgps_station if dgps_station and dgps_station.strip() else None,
-                device_id=device_id.strip()
+                timestamp,
+                latitude,
+                longitude,
+                fix_quality,
+                num_sats,
+                hdop_value,
+                alt_value,
+                float(geoid_sep) if geoid_sep else None,
+                float(dgps_time) if dgps_time else None,
+                dgps_station.decode('ascii') if dgps_station.strip() else None,
+                device_id
             )
             
-        except Exception as e:
+        except (ValueError, OverflowError) as e:
+            # Malformed numeric/text field
             logger.error("Failed to parse GPGGA sentence", 
-                        sentence=sentence, 
+                        sentence=_for_log(sentence), 
                         error=str(e))
             return None
     
     @staticmethod
-    def _verify_checksum(sentence: str) -> bool:
-        """Verify NMEA checksum."""
-        if '*' not in sentence:
-            return False
+    def _verify_checksum(data: bytes, checksum: bytes) -> bool:
+        """
+        Verify NMEA checksum.
         
+        Args:
+            data: Sentence body between '$' and '*'
+            checksum: Two hex digits following '*'
+        """
         try:
-            data, checksum = sentence.split('*')
-            # Remove the $ if present
-            if data.startswith('$'):
-                data = data[1:]
+            if len(data) <= 256:
+                # XOR all bytes at once: read the body as one integer and fold
+                # it in half repeatedly, so byte lane 0 ends up holding the
+                # XOR of every byte (bodies up to 256 bytes)
+                folded = int.from_bytes(data, 'little')
+                folded ^= folded >> 1024
+                folded ^= folded >> 512
+                folded ^= folded >> 256
+                folded ^= folded >> 128
+                folded ^= folded >> 64
+                folded ^= folded >> 32
+                folded ^= folded >> 16
+                folded ^= folded >> 8
+                calculated = folded & 0xFF
+            else:
+                calculated = 0
+                for byte in data:
+                    calculated ^= byte
             
-            # Calculate checksum
-            calculated = 0
-            for char in data:
-                calculated ^= ord(char)
-            
-            return f"{calculated:02X}" == checksum.upper()
+            return len(checksum) == 2 and int(checksum, 16) == calculated
         except Exception:
             return False
     
     @staticmethod
-    def _parse_coordinate(coord_str: str, is_negative: bool) -> float:
+    def _parse_coordinate(coord_str: bytes, is_negative: bool) -> float:
         """
         Parse NMEA coordinate format to decimal degrees.
         
         Args:
-            coord_str: Coordinate string in DDMM.mmmm or DDDMM.mmmm format
+            coord_str: Coordinate in DDMM.mmmm or DDDMM.mmmm format
             is_negative: True if South or West
             
         Returns:
             Decimal degrees
         """
-        # Split on decimal point to get the integer part
-        parts = coord_str.split('.')
-        integer_part = parts[0]
-        decimal_part = parts[1] if len(parts) > 1 else '0'
-        
-        # Last 2 digits of integer part are minutes
-        if len(integer_part) >= 2:
-            degrees = int(integer_part[:-2]) if len(integer_part) > 2 else 0
-            minutes_int = int(integer_part[-2:])
-            minutes = float(f"{minutes_int}.{decimal_part}")
-        else:
-            degrees = 0
-            minutes = float(coord_str)
-        
-        decimal = degrees + (minutes / 60.0)
+        # Everything above the last two integer digits is degrees, the rest
+        # is minutes. Minutes are decoded from their own digits rather than
+        # by subtracting from float(coord_str), which would leave rounding
+        # noise in the last digits (4807.038 -> 48.11729999999999)
+        whole, _, frac = coord_str.partition(b'.')
+        degrees = int(whole[:-2]) if len(whole) > 2 else 0
+        minutes = float(whole[-2:] + b'.' + frac)
+        decimal = degrees + minutes / 60.0
         return -decimal if is_negative else decimal
@@ -1,69 +1,199 @@
 """Logging configuration with structured logging support."""
 
+import os
 import sys
+import time
+import atexit
+import collections
+import queue
 import logging
+from dataclasses import dataclass, field
+from functools import lru_cache
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
 from pathlib import Path
-from typing import Optional, Any, Dict
+from types import MappingProxyType
+from typing import Optional, Any, Dict, List, Mapping, Tuple
+import orjson
 import structlog
 from structlog.stdlib import LoggerFactory
-from prometheus_client import Counter, Histogram, Gauge, Info
+from prometheus_client import REGISTRY, Counter, Histogram, Gauge, Info
 
 from .config import Settings
 
 
+def _collector(metric_cls: type, name: str, documentation: str, **kwargs: Any) -> Any:
+    """
+    Create a Prometheus collector, or reuse the one already registered.
+    
+    Re-importing this module (reloads, test runs) would otherwise fail with
+    a duplicated timeseries error.
+    
+    Args:
+        metric_cls: Collector class (Counter, Gauge, ...)
+        name: Metric name
+        documentation: Metric help text
+        **kwargs: Extra collector arguments
+        
+    Returns:
+        The new or previously registered collector
+        
+    Raises:
+        ValueError: If the name is taken by a different kind of collector
+    """
+    try:
+        return metric_cls(name, documentation, **kwargs)
+    except ValueError:
+        # Look up whatever holds the series names this collector would register
+        # (e.g. Info adds an "_info" suffix)
+        unregistered = metric_cls(name, documentation, registry=None, **kwargs)
+        series = next(iter(REGISTRY._get_names(unregistered)))
+        existing = REGISTRY._names_to_collectors.get(series)
+        if not isinstance(existing, metric_cls):
+            raise
+        return existing
+
+
 # Prometheus metrics
-MESSAGES_RECEIVED = Counter(
+MESSAGES_RECEIVED = _collector(
+    Counter,
     'gpgga_messages_received_total',
     'Total number of GPGGA messages received'
 )
 
-MESSAGES_PARSED = Counter(
+MESSAGES_PARSED = _collector(
+    Counter,
     'gpgga_messages_parsed_total',
     'Total number of GPGGA messages successfully parsed'
 )
 
-PARSE_ERRORS = Counter(
+MESSAGES_DROPPED = _collector(
+    Counter,
+    'gpgga_messages_dropped_total',
+    'Total number of parsed GPGGA messages dropped because the receive queue was full'
+)
+
+PARSE_ERRORS = _collector(
+    Counter,
     'gpgga_parse_errors_total',
     'Total number of GPGGA parse errors'
 )
 
-COT_CONVERSIONS = Counter(
+COT_CONVERSIONS = _collector(
+    Counter,
     'cot_conversions_total',
     'Total number of successful CoT conversions'
 )
 
-COT_SENT = Counter(
+COT_SENT = _collector(
+    Counter,
     'cot_messages_sent_total',
     'Total number of CoT messages sent to TAK'
 )
 
-COT_SEND_ERRORS = Counter(
+COT_SEND_ERRORS = _collector(
+    Counter,
     'cot_send_errors_total',
     'Total number of errors sending CoT to TAK'
 )
 
-MESSAGE_PROCESSING_TIME = Histogram(
+COT_DROPPED = _collector(
+    Counter,
+    'cot_messages_dropped_total',
+    'Total number of queued CoT messages dropped because the send buffer was full'
+)
+
+MESSAGE_PROCESSING_TIME = _collector(
+    Histogram,
     'message_processing_seconds',
     'Time to process a GPGGA message to CoT',
     buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
 )
 
-ACTIVE_DEVICES = Gauge(
+ACTIVE_DEVICES = _collector(
+    Gauge,
     'active_devices_count',
     'Number of devices seen in the last period'
 )
 
-TAK_CONNECTION_STATUS = Gauge(
+TAK_CONNECTION_STATUS = _collector(
+    Gauge,
     'tak_connection_status',
     'TAK server connection status (1=connected, 0=disconnected)'
 )
 
-APP_INFO = Info(
+APP_INFO = _collector(
+    Info,
     'gpgga_cot_relay',
     'Application information'
 )
 
 
+@dataclass
+class MetricsBuffer:
+    """
+    Message metrics accumulated locally and pushed to Prometheus in bulk.
+    
+    Every prometheus_client update takes a lock, so the hot path only bumps
+    these plain fields and flush() is called periodically.
+    """
+    
+    received: int = 0
+    converted: int = 0
+    sent: int = 0
+    rx_dropped: int = 0
+    tx_dropped: int = 0
+    send_errors: int = 0
+    latencies: List[float] = field(default_factory=list)
+    
+    def count_drop(self, kind: str, message: str, count: int = 1, **fields: Any) -> None:
+        """
+        Count dropped messages, warning only for the first drop per flush window.
+        
+        Args:
+            kind: "rx" (receive queue) or "tx" (TAK send buffer)
+            message: Warning logged for the first drop since the last flush
+            count: Number of messages dropped
+            **fields: Extra fields for the warning
+        """
+        attr = f"{kind}_dropped"
+        previous = getattr(self, attr)
+        setattr(self, attr, previous + count)
+        if not previous:
+            structlog.get_logger(__name__).warning(message, **fields)
+    
+    def flush(self) -> None:
+        """Push accumulated metrics to the Prometheus collectors and reset."""
+        if self.received:
+            MESSAGES_RECEIVED.inc(self.received)
+            MESSAGES_PARSED.inc(self.received)
+            self.received = 0
+        if self.converted:
+            COT_CONVERSIONS.inc(self.converted)
+            self.converted = 0
+        if self.sent:
+            COT_SENT.inc(self.sent)
+            self.sent = 0
+        if self.rx_dropped:
+            MESSAGES_DROPPED.inc(self.rx_dropped)
+            self.rx_dropped = 0
+        if self.tx_dropped:
+            COT_DROPPED.inc(self.tx_dropped)
+            self.tx_dropped = 0
+        if self.send_errors:
+            COT_SEND_ERRORS.inc(self.send_errors)
+            self.send_errors = 0
+        if self.latencies:
+            observe = MESSAGE_PROCESSING_TIME.observe
+            for latency in self.latencies:
+                observe(latency)
+            self.latencies.clear()
+
+
+def _orjson_str_dumps(obj: Any, **kwargs: Any) -> str:
+    """orjson serializer for renderers whose output goes through stdlib logging."""
+    return orjson.dumps(obj, **kwargs).decode("utf-8")
+
+
 def setup_logging(settings: Settings) -> None:
     """
     Configure structured logging with structlog.
@@ -71,37 +201,53 @@ def setup_logging(settings: Settings) -> None:
     Args:
         settings: Application settings
     """
+    level = getattr(logging, settings.log_level)
+    
     # Set up stdlib logging
     logging.basicConfig(
         format="%(message)s",
         stream=sys.stdout,
-        level=getattr(logging, settings.log_level)
+        level=level
     )
     
-    # Configure structlog processors
-    processors = [
-        structlog.stdlib.filter_by_level,
-        structlog.stdlib.add_logger_name,
-        structlog.stdlib.add_log_level,
-        structlog.stdlib.PositionalArgumentsFormatter(),
+    # JSON to stdout only: skip stdlib logging entirely and have structlog
+    # write orjson bytes straight to the stream. File logging still needs the
+    # stdlib handlers, so it keeps the stdlib-backed pipeline.
+    use_stdlib = settings.log_format != "json" or bool(settings.log_file)
+    verbose = settings.log_level == "DEBUG"
+    
+    # Every processor runs on every log call, so production gets the minimal
+    # chain; DEBUG adds the ones only useful while troubleshooting.
+    # The app name is bound once as a context variable.
+    structlog.contextvars.bind_contextvars(app="gpgga-cot-relay")
+    processors: List[Any] = [structlog.contextvars.merge_contextvars]
+    if verbose:
+        if use_stdlib:
+            processors.append(structlog.stdlib.add_logger_name)
+        processors.append(structlog.processors.StackInfoRenderer())
+    processors += [
+        structlog.processors.add_log_level,
         structlog.processors.TimeStamper(fmt="iso"),
-        structlog.processors.StackInfoRenderer(),
         structlog.processors.format_exc_info,
-        structlog.processors.UnicodeDecoder(),
-        add_app_context,
     ]
+    if verbose:
+        processors.append(structlog.processors.UnicodeDecoder())
     
     # Add appropriate renderer based on format
-    if settings.log_format == "json":
-        processors.append(structlog.processors.JSONRenderer())
+    if not use_stdlib:
+        processors.append(structlog.processors.JSONRenderer(serializer=orjson.dumps))
+    elif settings.log_format == "json":
+        processors.append(structlog.processors.JSONRenderer(serializer=_orjson_str_dumps))
     else:
         processors.append(structlog.dev.ConsoleRenderer(colors=False))
     
-    # Configure structlog
+    # Configure structlog; the filtering wrapper turns disabled levels into
+    # no-op methods
     structlog.configure(
         processors=processors,
+        wrapper_class=structlog.make_filtering_bound_logger(level),
         context_class=dict,
-        logger_factory=LoggerFactory(),
+        logger_factory=LoggerFactory() if use_stdlib else structlog.BytesLoggerFactory(),
         cache_logger_on_first_use=True,
     )
     
@@ -132,9 +278,7 @@ def setup_file_logging(log_file: str, log_level: str) -> None:
         log_path.parent.mkdir(parents=True, exist_ok=True)
         
         # Create file handler with rotation
-        from logging.handlers import RotatingFileHandler
-        
-        file_handler = RotatingFileHandler(
+        file_handler = _RegularFileRotatingHandler(
             log_file,
             maxBytes=10 * 1024 * 1024,  # 10MB
             backupCount=5
@@ -148,8 +292,15 @@ def setup_file_logging(log_file: str, log_level: str) -> None:
         )
         file_handler.setFormatter(formatter)
         
+        # Writes (and rotation) happen on a listener thread; the root logger
+        # only puts records on an in-memory queue
+        log_queue: queue.SimpleQueue = queue.SimpleQueue()
+        listener = QueueListener(log_queue, file_handler, respect_handler_level=True)
+        listener.start()
+        atexit.register(listener.stop)
+        
         # Add handler to root logger
-        logging.getLogger().addHandler(file_handler)
+        logging.getLogger().addHandler(QueueHandler(log_queue))
         
     except Exception as e:
         logger = structlog.get_logger(__name__)
@@ -158,20 +309,51 @@ def setup_file_logging(log_file: str, log_level: str) -> None:
                     error=str(e))
 
 
-def add_app_context(logger: Any, method_name: str, event_dict: Dict[str, Any]) -> Dict[str, Any]:
+def is_debug_enabled() -> bool:
     """
-    Add application context to all log messages.
+    Check if DEBUG level logging is enabled.
     
-    Args:
-        logger: Logger instance
-        method_name: Method name
-        event_dict: Event dictionary
-        
-    Returns:
-        Modified event dictionary
+    Hot paths check this before a debug log call so the event dict is
+    never built when DEBUG is off.
+    """
+    return logging.getLogger().isEnabledFor(logging.DEBUG)
+
+
+class _RegularFileRotatingHandler(RotatingFileHandler):
+    """
+    RotatingFileHandler that checks the log path is a regular file once.
+    
+    The stdlib handler stats the path on every record to avoid rotating
+    special files such as /dev/null; the answer doesn't change, so cache it.
     """
-    event_dict['app'] = 'gpgga-cot-relay'
-    return event_dict
+    
+    _is_regular_file: Optional[bool] = None
+    
+    def shouldRollover(self, record: logging.LogRecord) -> bool:
+        if self.stream is None:
+            self.stream = self._open()
+        if self._is_regular_file is None:
+            self._is_regular_file = os.path.isfile(self.baseFilename)
+        if not self._is_regular_file or self.maxBytes <= 0:
+            return False
+        
+        pos = self.stream.tell()
+        if not pos:
+            return False
+        msg = "%s\n" % self.format(record)
+        return pos + len(msg) >= self.maxBytes
+
+
+# Identical errors (same kind, type and message) are logged at most once per
+# window; repeats in between are only counted
+ERROR_LOG_WINDOW = 1.0
+ERROR_LOG_MAX_KEYS = 1024
+
+
+@lru_cache(maxsize=256)
+def _error_fields(error_type: str, error_str: str) -> Mapping[str, str]:
+    """Log fields for an error, shared (read-only) between repeats of the same error."""
+    return MappingProxyType({"error": error_str, "error_type": error_type})
 
 
 class ErrorHandler:
@@ -179,54 +361,121 @@ class ErrorHandler:
     
     def __init__(self):
         self.logger = structlog.get_logger(__name__)
-        self.error_counts: Dict[str, int] = {}
+        self.error_counts: Dict[str, int] = collections.Counter()
+        
+        # (kind, error type, message) -> (last logged at, repeats suppressed since)
+        self._recent: Dict[Tuple[str, str, str], Tuple[float, int]] = {}
+        
+        # Bound metric methods, looked up once rather than per error
+        self._parse_errors_inc = PARSE_ERRORS.inc
+        self._send_errors_inc = COT_SEND_ERRORS.inc
+        self._set_connection_status = TAK_CONNECTION_STATUS.set
+        
+    def _sample(self, kind: str, error: Exception) -> Optional[Mapping[str, Any]]:
+        """
+        Decide whether to log an error, suppressing bursts of identical ones.
         
+        Args:
+            kind: Error category
+            error: The exception being handled
+            
+        Returns:
+            Log fields for the error (with a suppressed count if repeats were
+            skipped), or None if it shouldn't be logged
+        """
+        error_type = type(error).__name__
+        error_str = str(error)
+        key = (kind, error_type, error_str)
+        now = time.monotonic()
+        
+        last, suppressed = self._recent.get(key, (0.0, 0))
+        if now - last < ERROR_LOG_WINDOW:
+            self._recent[key] = (last, suppressed + 1)
+            return None
+        
+        if len(self._recent) >= ERROR_LOG_MAX_KEYS:
+            # Report and drop finished windows first; clear only if still full
+            self.flush_suppressed()
+            if len(self._recent) >= ERROR_LOG_MAX_KEYS:
+                self._recent.clear()
+        self._recent[key] = (now, 0)
+        
+        fields = _error_fields(error_type, error_str)
+        if suppressed:
+            return {**fields, "suppressed": suppressed}
+        return fields
+    
     def handle_parse_error(self, message: str, error: Exception, sender: Optional[tuple] = None) -> None:
         """Handle GPGGA parse errors."""
-        PARSE_ERRORS.inc()
-        self.error_counts['parse'] = self.error_counts.get('parse', 0) + 1
+        self._parse_errors_inc()
+        self.error_counts['parse'] += 1
         
-        self.logger.warning("GPGGA parse error",
-                          message=message,
-                          error=str(error),
-                          error_type=type(error).__name__,
-                          sender=sender)
+        fields = self._sample('parse', error)
+        if fields is not None:
+            self.logger.warning("GPGGA parse error",
+                              message=message,
+                              sender=sender,
+                              **fields)
     
     def handle_conversion_error(self, device_id: str, error: Exception) -> None:
         """Handle CoT conversion errors."""
-        self.error_counts['conversion'] = self.error_counts.get('conversion', 0) + 1
+        self.error_counts['conversion'] += 1
         
-        self.logger.error("CoT conversion error",
-                         device_id=device_id,
-                         error=str(error),
-                         error_type=type(error).__name__)
+        fields = self._sample('conversion', error)
+        if fields is not None:
+            self.logger.error("CoT conversion error",
+                             device_id=device_id,
+                             **fields)
     
     def handle_send_error(self, device_id: str, error: Exception) -> None:
         """Handle TAK send errors."""
-        COT_SEND_ERRORS.inc()
-        self.error_counts['send'] = self.error_counts.get('send', 0) + 1
+        self._send_errors_inc()
+        self.error_counts['send'] += 1
         
-        self.logger.error("TAK send error",
-                         device_id=device_id,
-                         error=str(error),
-                         error_type=type(error).__name__)
+        fields = self._sample('send', error)
+        if fields is not None:
+            self.logger.error("TAK send error",
+                             device_id=device_id,
+                             **fields)
     
     def handle_connection_error(self, error: Exception) -> None:
         """Handle TAK connection errors."""
-        TAK_CONNECTION_STATUS.set(0)
-        self.error_counts['connection'] = self.error_counts.get('connection', 0) + 1
+        self._set_connection_status(0)
+        self.error_counts['connection'] += 1
+        
+        fields = self._sample('connection', error)
+        if fields is not None:
+            self.logger.error("TAK connection error", **fields)
+    
+    def flush_suppressed(self) -> None:
+        """
+        Log how many identical errors were suppressed in windows that have ended.
         
-        self.logger.error("TAK connection error",
-                         error=str(error),
-                         error_type=type(error).__name__)
+        Without this, repeats at the tail of a burst would only be reported
+        if the same error happened again later. Called periodically.
+        """
+        now = time.monotonic()
+        recent = self._recent
+        for key, (last, suppressed) in list(recent.items()):
+            if now - last < ERROR_LOG_WINDOW:
+                continue
+            # Window over: forget the key so the next occurrence logs in full
+            del recent[key]
+            if suppressed:
+                kind, error_type, error_str = key
+                self.logger.warning("Similar errors suppressed",
+                                   kind=kind,
+                                   suppressed=suppressed,
+                                   **_error_fields(error_type, error_str))
     
     def get_error_stats(self) -> Dict[str, int]:
         """Get error statistics."""
-        return self.error_counts.copy()
+        return dict(self.error_counts)
     
     def reset_stats(self) -> None:
         """Reset error statistics."""
         self.error_counts.clear()
+        self._recent.clear()
 
 
 # Global error handler instance
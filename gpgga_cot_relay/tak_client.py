@@ -8,6 +8,7 @@ import structlog
 import pytak
 
 from .config import Settings
+from .logging_config import is_debug_enabled, MetricsBuffer
 
 logger = structlog.get_logger(__name__)
 
@@ -15,12 +16,14 @@ logger = structlog.get_logger(__name__)
 class TAKClient:
     """Managed TAK client with automatic reconnection and error handling."""
     
-    def __init__(self, settings: Settings):
+    def __init__(self, settings: Settings, metrics: Optional[MetricsBuffer] = None):
         """
         Initialize TAK client.
         
         Args:
             settings: Application settings
+            metrics: Buffer for send and drop counts, flushed by the owner;
+                a private one (flushed on stop) is used if not given
         """
         self.settings = settings
         self.tx_queue: asyncio.Queue = asyncio.Queue(maxsize=settings.message_queue_size)
@@ -28,8 +31,12 @@ class TAKClient:
         self._running = False
         self._connected = False
         self._reconnect_task: Optional[asyncio.Task] = None
+        self._ssl_context: Optional[ssl.SSLContext] = None  # Built once in start()
         self.messages_sent = 0
+        self.messages_dropped = 0
         self.send_errors = 0
+        self._metrics = metrics if metrics is not None else MetricsBuffer()
+        self._debug_enabled = False
         
     async def start(self) -> None:
         """Start the TAK client and connection manager."""
@@ -37,7 +44,11 @@ class TAKClient:
             logger.warning("TAK client already running")
             return
         
+        if self.settings.tak_protocol == "tls":
+            self._ssl_context = self._create_ssl_context()
+        
         self._running = True
+        self._debug_enabled = is_debug_enabled()
         
         # Start the connection manager
         self._reconnect_task = asyncio.create_task(self._connection_manager())
@@ -71,39 +82,47 @@ class TAKClient:
             except asyncio.QueueEmpty:
                 break
         
+        # Push any drop counts not yet flushed
+        self._metrics.flush()
+        
         logger.info("TAK client stopped")
     
-    async def send_cot(self, cot_xml: str) -> bool:
+    async def send_cot(self, cot_xml: bytes) -> bool:
         """
         Send a CoT message to the TAK server.
         
         Args:
-            cot_xml: CoT XML string to send
+            cot_xml: UTF-8 encoded CoT XML to send
             
         Returns:
-            True if queued successfully, False otherwise
+            True if queued successfully, False otherwise. A full queue drops
+            its oldest message to make room rather than blocking.
         """
         if not self._running:
             logger.warning("Cannot send CoT - client not running")
             return False
         
         try:
-            # Try to add to queue with timeout
-            await asyncio.wait_for(
-                self.tx_queue.put(cot_xml.encode('utf-8')),
-                timeout=self.settings.tak_send_timeout
-            )
+            try:
+                self.tx_queue.put_nowait(cot_xml)
+            except asyncio.QueueFull:
+                # Drop the oldest (stalest) message instead of stalling the caller
+                self.tx_queue.get_nowait()
+                self.tx_queue.put_nowait(cot_xml)
+                self.messages_dropped += 1
+                self._metrics.count_drop("tx", "CoT send queue full - dropping oldest messages",
+                                         dropped=self.messages_dropped)
+            # pytak writes the queue itself, so handing off is the last point
+            # this client sees
+            self.messages_sent += 1
+            self._metrics.sent += 1
             
-            logger.debug("CoT message queued for transmission",
-                        queue_size=self.tx_queue.qsize())
+            if self._debug_enabled:
+                logger.debug("CoT message queued for transmission",
+                            queue_size=self.tx_queue.qsize())
             
             return True
             
-        except asyncio.TimeoutError:
-            self.send_errors += 1
-            logger.error("Timeout queuing CoT message - queue full",
-                        queue_size=self.tx_queue.qsize())
-            return False
         except Exception as e:
             self.send_errors += 1
             logger.error("Failed to queue CoT message",
@@ -151,11 +170,6 @@ class TAKClient:
         host = self.settings.tak_host
         port = self.settings.tak_port
         
-        # Create SSL context if needed
-        ssl_context = None
-        if protocol == "tls":
-            ssl_context = self._create_ssl_context()
-        
         # Create appropriate worker based on protocol
         if protocol == "tcp" or protocol == "tls":
             # Use the EventWorker with TCP URL
@@ -163,7 +177,7 @@ class TAKClient:
             self.tx_worker = pytak.EventWorker(
                 self.tx_queue,
                 cot_url,
-                ssl_context=ssl_context
+                ssl_context=self._ssl_context
             )
         elif protocol == "udp":
             # Use the EventWorker with UDP URL
@@ -177,9 +191,6 @@ class TAKClient:
         
         # Start the worker
         await self.tx_worker.start()
-        
-        # Set up message counter
-        self._setup_message_counter()
     
     async def _disconnect(self) -> None:
         """Disconnect from TAK server."""
@@ -193,7 +204,7 @@ class TAKClient:
     
     def _create_ssl_context(self) -> ssl.SSLContext:
         """Create SSL context for TLS connections."""
-        context = ssl.create_default_context(ssl.Purpose.CLIENT_AUTH)
+        context = ssl.create_default_context(ssl.Purpose.SERVER_AUTH)
         
         # Load certificates if provided
         if self.settings.tak_cert_file and self.settings.tak_key_file:
@@ -228,18 +239,6 @@ class TAKClient:
         
         return context
     
-    def _setup_message_counter(self) -> None:
-        """Set up message counting for statistics."""
-        if hasattr(self.tx_worker, '_writer'):
-            # Wrap the writer to count messages
-            original_write = self.tx_worker._writer.write
-            
-            def counting_write(data):
-                self.messages_sent += 1
-                return original_write(data)
-            
-            self.tx_worker._writer.write = counting_write
-    
     def is_connected(self) -> bool:
         """Check if connected to TAK server."""
         return self._connected
@@ -249,6 +248,7 @@ class TAKClient:
         return {
             "connected": self._connected,
             "messages_sent": self.messages_sent,
+            "messages_dropped": self.messages_dropped,
             "send_errors": self.send_errors,
             "error_rate": self.send_errors / max(1, self.messages_sent + self.send_errors),
             "queue_size": self.tx_queue.qsize() if self.tx_queue else 0,
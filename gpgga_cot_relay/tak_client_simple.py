@@ -3,19 +3,33 @@
 import asyncio
 import socket
 import ssl
-from typing import Optional
+from collections import deque
+from typing import Deque, Optional
 import structlog
 
 from .config import Settings
+from .logging_config import is_debug_enabled, MetricsBuffer
 
 logger = structlog.get_logger(__name__)
 
+# TCP keepalive: start probing after 30s idle, every 10s, give up after 3 misses
+TCP_KEEPALIVE_IDLE = 30
+TCP_KEEPALIVE_INTERVAL = 10
+TCP_KEEPALIVE_COUNT = 3
+
 
 class SimpleTAKClient:
     """Simple TAK client with direct socket connection."""
     
-    def __init__(self, settings: Settings):
-        """Initialize TAK client."""
+    def __init__(self, settings: Settings, metrics: Optional[MetricsBuffer] = None):
+        """
+        Initialize TAK client.
+        
+        Args:
+            settings: Application settings
+            metrics: Buffer for send and drop counts, flushed by the owner;
+                a private one (flushed on stop) is used if not given
+        """
         self.settings = settings
         self.host = self.settings.tak_host
         self.port = self.settings.tak_port
@@ -26,9 +40,19 @@ class SimpleTAKClient:
         self._writer: Optional[asyncio.StreamWriter] = None
         self._reader: Optional[asyncio.StreamReader] = None
         self._reconnect_task: Optional[asyncio.Task] = None
+        self._ssl_context: Optional[ssl.SSLContext] = None  # Built once in start()
+        
+        # Outgoing messages, written to the socket in batches by the sender task.
+        # Bounded ring buffer: when full, the oldest (stalest) position is dropped.
+        self._tx_buffer: Deque[bytes] = deque(maxlen=settings.message_queue_size)
+        self._tx_ready = asyncio.Event()
+        self._sender_task: Optional[asyncio.Task] = None
         
         self.messages_sent = 0
+        self.messages_dropped = 0
         self.send_errors = 0
+        self._metrics = metrics if metrics is not None else MetricsBuffer()
+        self._debug_enabled = False
         
     async def start(self) -> None:
         """Start the TAK client."""
@@ -36,8 +60,13 @@ class SimpleTAKClient:
             logger.warning("TAK client already running")
             return
         
+        if self.protocol == "tls":
+            self._ssl_context = self._create_ssl_context()
+        
         self._running = True
+        self._debug_enabled = is_debug_enabled()
         self._reconnect_task = asyncio.create_task(self._connection_manager())
+        self._sender_task = asyncio.create_task(self._sender())
         
         logger.info("TAK client started", server=self.settings.tak_server_url)
     
@@ -48,43 +77,91 @@ class SimpleTAKClient:
         
         self._running = False
         
-        if self._reconnect_task:
-            self._reconnect_task.cancel()
-            try:
-                await self._reconnect_task
-            except asyncio.CancelledError:
-                pass
+        for task in (self._reconnect_task, self._sender_task):
+            if task:
+                task.cancel()
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    pass
         
         await self._disconnect()
         
+        # Push any drop counts not yet flushed
+        self._metrics.flush()
+        
         logger.info("TAK client stopped")
     
-    async def send_cot(self, cot_xml: str) -> bool:
-        """Send a CoT message to the TAK server."""
+    async def send_cot(self, cot_xml: bytes) -> bool:
+        """
+        Queue a CoT message for sending to the TAK server.
+        
+        Args:
+            cot_xml: UTF-8 encoded CoT XML to send
+            
+        Returns:
+            True if queued, False if not connected. A full buffer drops its
+            oldest message to make room rather than rejecting this one.
+        """
         if not self._running or not self._connected:
             logger.warning("Cannot send CoT - client not connected")
             return False
         
-        try:
-            # Ensure XML ends with newline for TAK server
-            if not cot_xml.endswith('\n'):
-                cot_xml += '\n'
-            
-            # Send the CoT message
-            self._writer.write(cot_xml.encode('utf-8'))
-            await self._writer.drain()
-            
-            self.messages_sent += 1
-            logger.debug("CoT message sent successfully", 
-                        message_count=self.messages_sent)
+        # TAK streams are newline-delimited; CoTConverter output already is
+        if not cot_xml.endswith(b'\n'):
+            cot_xml += b'\n'
+        
+        buffer = self._tx_buffer
+        if len(buffer) == buffer.maxlen:
+            self.messages_dropped += 1
+            self._metrics.count_drop("tx", "CoT send buffer full - dropping oldest messages",
+                                     dropped=self.messages_dropped)
+        buffer.append(cot_xml)
+        self._tx_ready.set()
+        return True
+    
+    async def _sender(self) -> None:
+        """
+        Write queued CoT messages to the TAK server.
+        
+        Everything buffered while the previous write was draining (up to
+        tak_send_batch_size messages) goes out in one writelines() and drain().
+        """
+        buffer = self._tx_buffer
+        ready = self._tx_ready
+        batch_size = self.settings.tak_send_batch_size
+        while True:
+            await ready.wait()
+            batch = [buffer.popleft() for _ in range(min(len(buffer), batch_size))]
+            if not buffer:
+                ready.clear()
             
-            return True
+            writer = self._writer
+            if writer is None or not self._connected:
+                self.send_errors += len(batch)
+                self._metrics.send_errors += len(batch)
+                logger.warning("TAK client not connected - queued CoT messages dropped",
+                             count=len(batch))
+                continue
             
-        except Exception as e:
-            self.send_errors += 1
-            logger.error("Failed to send CoT message", error=str(e))
-            self._connected = False
-            return False
+            try:
+                writer.writelines(batch)
+                await writer.drain()
+                
+                self.messages_sent += len(batch)
+                self._metrics.sent += len(batch)
+                if self._debug_enabled:
+                    logger.debug("CoT messages sent successfully",
+                                batch_size=len(batch),
+                                message_count=self.messages_sent)
+                
+            except Exception as e:
+                self.send_errors += len(batch)
+                self._metrics.send_errors += len(batch)
+                logger.error("Failed to send CoT messages",
+                            error=str(e),
+                            count=len(batch))
+                self._connected = False
     
     async def _connection_manager(self) -> None:
         """Manage TAK server connection with automatic reconnection."""
@@ -103,15 +180,13 @@ class SimpleTAKClient:
                 # Keep connection alive
                 await asyncio.sleep(self.settings.health_check_interval)
                 
-                # Simple connection check - try to write empty data
-                if self._writer:
-                    try:
-                        self._writer.write(b'')
-                        await self._writer.drain()
-                    except:
-                        logger.warning("TAK connection lost - reconnecting")
-                        self._connected = False
-                        await self._disconnect()
+                # Passive connection check; dead peers are detected by TCP
+                # keepalive, which closes the transport
+                if (self._writer is None or self._writer.is_closing()
+                        or (self._reader is not None and self._reader.at_eof())):
+                    logger.warning("TAK connection lost - reconnecting")
+                    self._connected = False
+                    await self._disconnect()
                 
             except Exception as e:
                 logger.error("TAK connection error",
@@ -124,20 +199,48 @@ class SimpleTAKClient:
     
     async def _connect(self) -> None:
         """Establish connection to TAK server."""
-        # Create SSL context if needed
-        ssl_context = None
-        if self.protocol == "tls":
-            ssl_context = self._create_ssl_context()
-        
         # Connect based on protocol
         if self.protocol in ["tcp", "tls"]:
             self._reader, self._writer = await asyncio.open_connection(
                 self.host, 
                 self.port,
-                ssl=ssl_context
+                ssl=self._ssl_context
             )
         else:
             raise ValueError(f"Unsupported protocol: {self.protocol}")
+        
+        self._configure_socket(self._writer.get_extra_info('socket'))
+    
+    @staticmethod
+    def _configure_socket(sock: Optional[socket.socket]) -> None:
+        """
+        Disable Nagle and enable TCP keepalive on the TAK connection.
+        
+        asyncio normally sets TCP_NODELAY itself; it's set explicitly so small
+        CoT writes never wait on delayed ACKs whatever the event loop does.
+        
+        Args:
+            sock: Connected socket, if the transport exposes one
+        """
+        if sock is None:
+            return
+        
+        try:
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        except OSError as e:
+            logger.warning("Failed to set TCP_NODELAY", error=str(e))
+        
+        try:
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+            # Tuning options are platform specific
+            if hasattr(socket, 'TCP_KEEPIDLE'):
+                sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_KEEPIDLE, TCP_KEEPALIVE_IDLE)
+            if hasattr(socket, 'TCP_KEEPINTVL'):
+                sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_KEEPINTVL, TCP_KEEPALIVE_INTERVAL)
+            if hasattr(socket, 'TCP_KEEPCNT'):
+                sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_KEEPCNT, TCP_KEEPALIVE_COUNT)
+        except OSError as e:
+            logger.warning("Failed to enable TCP keepalive", error=str(e))
     
     async def _disconnect(self) -> None:
         """Disconnect from TAK server."""
@@ -153,7 +256,7 @@ class SimpleTAKClient:
     
     def _create_ssl_context(self) -> ssl.SSLContext:
         """Create SSL context for TLS connections."""
-        context = ssl.create_default_context(ssl.Purpose.CLIENT_AUTH)
+        context = ssl.create_default_context(ssl.Purpose.SERVER_AUTH)
         
         # Load certificates if provided
         if self.settings.tak_cert_file and self.settings.tak_key_file:
@@ -197,8 +300,9 @@ class SimpleTAKClient:
         return {
             "connected": self._connected,
             "messages_sent": self.messages_sent,
+            "messages_dropped": self.messages_dropped,
             "send_errors": self.send_errors,
             "error_rate": self.send_errors / max(1, self.messages_sent + self.send_errors),
-            "queue_size": 0,  # No queue in simple implementation
-            "queue_capacity": 0
+            "queue_size": len(self._tx_buffer),
+            "queue_capacity": self.settings.message_queue_size
         }
@@ -1,30 +1,77 @@
-"""Asynchronous UDP listener for GPGGA messages."""
+"""
+Asynchronous UDP listener for GPGGA messages.
+
+Bursts from many devices are absorbed by the kernel socket receive buffer
+(UDP_SOCKET_RCVBUF, 12 MiB by default). Without CAP_NET_ADMIN the kernel
+clamps it to net.core.rmem_max, so on the host set:
+
+    sysctl -w net.core.rmem_max=12582912
+    sysctl -w net.core.netdev_max_backlog=5000
+
+Datagrams are read by draining the non-blocking socket from an event loop
+reader callback, so one readiness event handles a batch of queued packets
+(UDP_BATCH_SIZE) instead of one transport dispatch per datagram. Loops without
+add_reader() support (Windows proactor) fall back to a regular datagram endpoint.
+With UDP_THREADED_RECEIVE the socket is read by a dedicated thread instead,
+which hands datagrams to the event loop in batches.
+"""
 
 import asyncio
+import selectors
 import socket
-from typing import Optional, Callable, Awaitable
+import sys
+import threading
+from typing import Callable, List, Optional, Tuple
 import structlog
 
 from .config import Settings
 from .gpgga_parser import GPGGAParser, GPGGAData
+from .logging_config import is_debug_enabled, MetricsBuffer
 
 logger = structlog.get_logger(__name__)
 
+# Largest datagram read; GPGGA sentences are well under 100 bytes
+RECV_BUFFER_SIZE = 2048
+
+# Seconds the receive thread waits for data before checking for shutdown
+RECV_THREAD_POLL_INTERVAL = 0.5
+
+# Batches the receive thread may have waiting on the event loop; beyond this
+# the loop is not keeping up and further batches are dropped
+RECV_THREAD_MAX_PENDING = 64
+
+# Linux doubles socket buffer sizes on set (see _set_receive_buffer)
+_LINUX = sys.platform.startswith('linux')
+
 
 class UDPProtocol(asyncio.DatagramProtocol):
     """Asyncio UDP protocol handler."""
     
-    def __init__(self, message_handler: Callable[[GPGGAData, tuple], Awaitable[None]]):
+    __slots__ = ('message_handler', 'rcvbuf_size', 'batch_size', '_recv_buf',
+                 '_recv_view', 'transport', 'messages_received',
+                 'parse_errors', '_debug_enabled')
+    
+    def __init__(self, message_handler: Callable[[GPGGAData, tuple], None],
+                 rcvbuf_size: int = 65536, batch_size: int = 32):
         """
         Initialize UDP protocol.
         
         Args:
-            message_handler: Async function to handle parsed GPGGA data
+            message_handler: Non-blocking callback to hand off parsed GPGGA data
+            rcvbuf_size: Kernel socket receive buffer size in bytes
+            batch_size: Maximum datagrams handled per drain() call
         """
         self.message_handler = message_handler
+        self.rcvbuf_size = rcvbuf_size
+        self.batch_size = batch_size
+        # Reused for every read in drain(); parsing is synchronous, so each
+        # datagram is done with before the next read overwrites it
+        self._recv_buf = bytearray(RECV_BUFFER_SIZE)
+        self._recv_view = memoryview(self._recv_buf)
         self.transport: Optional[asyncio.DatagramTransport] = None
         self.messages_received = 0
         self.parse_errors = 0
+        self._debug_enabled = is_debug_enabled()
         
     def connection_made(self, transport: asyncio.DatagramTransport) -> None:
         """Called when connection is established."""
@@ -33,8 +80,8 @@ class UDPProtocol(asyncio.DatagramProtocol):
         if sock:
             # Set socket options for better performance
             try:
-                # Increase receive buffer size
-                sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 65536)
+                # Increase receive buffer size to absorb bursts
+                self._set_receive_buffer(sock)
                 # Enable address reuse
                 sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
             except Exception as e:
@@ -43,6 +90,92 @@ class UDPProtocol(asyncio.DatagramProtocol):
         logger.info("UDP listener started", 
                    local_addr=transport.get_extra_info('sockname'))
     
+    def drain(self, sock: socket.socket) -> None:
+        """
+        Read and handle the datagrams currently queued on the socket.
+        
+        At most batch_size are handled so other tasks get to run under
+        sustained load; the reader is level-triggered, so the loop calls
+        back on its next iteration if more are waiting.
+        
+        Args:
+            sock: Bound non-blocking UDP socket
+        """
+        recvfrom_into = sock.recvfrom_into
+        buf = self._recv_buf
+        view = self._recv_view
+        handle = self._handle
+        # Counted locally and added to the totals once per batch
+        received = 0
+        errors = 0
+        try:
+            for _ in range(self.batch_size):
+                try:
+                    nbytes, addr = recvfrom_into(buf)
+                except (BlockingIOError, InterruptedError):
+                    break
+                except OSError as e:
+                    self.error_received(e)
+                    break
+                received += 1
+                # One exact-size copy; recvfrom() would allocate a full-size
+                # buffer per datagram and then shrink it
+                if not handle(view[:nbytes].tobytes(), addr):
+                    errors += 1
+        finally:
+            self.messages_received += received
+            self.parse_errors += errors
+    
+    def datagrams_received(self, batch: List[Tuple[bytes, tuple]]) -> None:
+        """
+        Handle a batch of datagrams read by the receive thread.
+        
+        Args:
+            batch: (data, sender address) pairs in arrival order
+        """
+        handle = self._handle
+        errors = 0
+        try:
+            for data, addr in batch:
+                if not handle(data, addr):
+                    errors += 1
+        finally:
+            self.messages_received += len(batch)
+            self.parse_errors += errors
+    
+    def _set_receive_buffer(self, sock: socket.socket) -> None:
+        """
+        Set the socket receive buffer size.
+        
+        SO_RCVBUFFORCE (Linux, needs CAP_NET_ADMIN) is tried first since it
+        ignores net.core.rmem_max; otherwise fall back to SO_RCVBUF, which
+        the kernel clamps to net.core.rmem_max. The effective size is read
+        back and logged so a clamped buffer is visible to operators.
+        """
+        forced = False
+        if hasattr(socket, 'SO_RCVBUFFORCE'):
+            try:
+                sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUFFORCE, self.rcvbuf_size)
+                forced = True
+            except OSError:
+                pass
+        if not forced:
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, self.rcvbuf_size)
+        
+        # Linux stores and reports double the granted size (bookkeeping
+        # overhead), so an unclamped buffer reads back as 2 * requested
+        effective = sock.getsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF)
+        expected = self.rcvbuf_size * 2 if _LINUX else self.rcvbuf_size
+        if effective < expected:
+            logger.warning("UDP receive buffer clamped by the kernel",
+                          requested=self.rcvbuf_size,
+                          effective=effective,
+                          hint=f"sysctl -w net.core.rmem_max={self.rcvbuf_size}")
+        else:
+            logger.info("UDP receive buffer set",
+                       requested=self.rcvbuf_size,
+                       effective=effective)
+    
     def datagram_received(self, data: bytes, addr: tuple) -> None:
         """
         Handle received datagram.
@@ -52,55 +185,41 @@ class UDPProtocol(asyncio.DatagramProtocol):
             addr: Sender address (host, port)
         """
         self.messages_received += 1
-        
-        try:
-            # Decode the data
-            message = data.decode('utf-8').strip()
-            
-            logger.debug("Received UDP message",
-                        sender=addr,
-                        message=message,
-                        bytes=len(data))
-            
-            # Parse GPGGA sentence
-            gpgga_data = GPGGAParser.parse(message)
-            
-            if gpgga_data:
-                # Schedule the message handler
-                asyncio.create_task(self._handle_message(gpgga_data, addr))
-            else:
-                self.parse_errors += 1
-                logger.warning("Failed to parse GPGGA message",
-                             sender=addr,
-                             message=message)
-                
-        except UnicodeDecodeError as e:
+        if not self._handle(data, addr):
             self.parse_errors += 1
-            logger.error("Failed to decode UDP message",
-                        sender=addr,
-                        error=str(e),
-                        data_hex=data.hex())
-        except Exception as e:
-            self.parse_errors += 1
-            logger.error("Unexpected error processing UDP message",
-                        sender=addr,
-                        error=str(e))
     
-    async def _handle_message(self, gpgga_data: GPGGAData, addr: tuple) -> None:
+    def _handle(self, data: bytes, addr: tuple) -> bool:
         """
-        Handle parsed GPGGA message.
+        Parse a datagram and hand it to the message handler.
         
         Args:
-            gpgga_data: Parsed GPGGA data
-            addr: Sender address
+            data: Raw datagram data
+            addr: Sender address (host, port)
+            
+        Returns:
+            False if the datagram is not a valid GPGGA sentence
         """
-        try:
-            await self.message_handler(gpgga_data, addr)
-        except Exception as e:
-            logger.error("Error in message handler",
-                        device_id=gpgga_data.device_id,
+        if self._debug_enabled:
+            logger.debug("Received UDP message",
                         sender=addr,
-                        error=str(e))
+                        message=data)
+        
+        # Senders may frame sentences with whitespace or CRLF
+        data = data.strip()
+        
+        # Cheap prefix check first so obvious junk never reaches the parser
+        if data.startswith(b'$GPGGA,'):
+            # Parse GPGGA sentence (as bytes - no decode needed)
+            gpgga_data = GPGGAParser.parse(data)
+            if gpgga_data is not None:
+                # Hand off to the message handler (queues for processing)
+                self.message_handler(gpgga_data, addr)
+                return True
+        
+        logger.warning("Failed to parse GPGGA message",
+                     sender=addr,
+                     message=data.decode('ascii', 'replace'))
+        return False
     
     def error_received(self, exc: Exception) -> None:
         """Handle protocol errors."""
@@ -125,19 +244,33 @@ class UDPProtocol(asyncio.DatagramProtocol):
 class UDPListener:
     """High-performance asynchronous UDP listener."""
     
+    __slots__ = ('settings', 'message_handler', 'transport', 'protocol',
+                 '_sock', '_loop', '_thread', '_thread_stop', '_pending',
+                 '_metrics', '_running')
+    
     def __init__(self, settings: Settings, 
-                 message_handler: Callable[[GPGGAData, tuple], Awaitable[None]]):
+                 message_handler: Callable[[GPGGAData, tuple], None],
+                 metrics: Optional[MetricsBuffer] = None):
         """
         Initialize UDP listener.
         
         Args:
             settings: Application settings
-            message_handler: Async function to handle parsed GPGGA data
+            message_handler: Non-blocking callback to hand off parsed GPGGA data
+            metrics: Buffer for drop counts, flushed by the owner; a private
+                one (flushed on stop) is used if not given
         """
         self.settings = settings
         self.message_handler = message_handler
         self.transport: Optional[asyncio.DatagramTransport] = None
         self.protocol: Optional[UDPProtocol] = None
+        self._sock: Optional[socket.socket] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._thread_stop = threading.Event()
+        # Free slots for batches handed from the receive thread to the loop
+        self._pending = threading.Semaphore(RECV_THREAD_MAX_PENDING)
+        self._metrics = metrics if metrics is not None else MetricsBuffer()
         self._running = False
         
     async def start(self) -> None:
@@ -147,13 +280,23 @@ class UDPListener:
             return
         
         try:
-            # Create endpoint
-            loop = asyncio.get_event_loop()
-            self.transport, self.protocol = await loop.create_datagram_endpoint(
-                lambda: UDPProtocol(self.message_handler),
-                local_addr=(self.settings.udp_listen_host, self.settings.udp_listen_port),
-                reuse_port=True  # Allow multiple processes to bind
-            )
+            loop = asyncio.get_running_loop()
+            protocol = UDPProtocol(self.message_handler,
+                                   self.settings.udp_socket_rcvbuf,
+                                   self.settings.udp_batch_size)
+            self.protocol = protocol
+            try:
+                if self.settings.udp_threaded_receive:
+                    self._start_thread(loop, protocol)
+                else:
+                    self._start_reader(loop, protocol)
+            except NotImplementedError:
+                # No add_reader() on this loop - use a datagram endpoint
+                self.transport, _ = await loop.create_datagram_endpoint(
+                    lambda: protocol,
+                    local_addr=(self.settings.udp_listen_host, self.settings.udp_listen_port),
+                    reuse_port=hasattr(socket, 'SO_REUSEPORT')
+                )
             
             self._running = True
             
@@ -178,6 +321,161 @@ class UDPListener:
                         error=str(e))
             raise
     
+    def _bind_socket(self, protocol: UDPProtocol) -> socket.socket:
+        """
+        Create and bind the UDP listening socket.
+        
+        Args:
+            protocol: Protocol that sizes the socket receive buffer
+            
+        Returns:
+            Bound UDP socket
+        """
+        host = self.settings.udp_listen_host
+        port = self.settings.udp_listen_port
+        family, _, _, _, addr = socket.getaddrinfo(
+            host, port, type=socket.SOCK_DGRAM, flags=socket.AI_PASSIVE
+        )[0]
+        
+        sock = socket.socket(family, socket.SOCK_DGRAM)
+        try:
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+            if hasattr(socket, 'SO_REUSEPORT'):
+                # Allow multiple processes to bind
+                sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+            try:
+                protocol._set_receive_buffer(sock)
+            except OSError as e:
+                logger.warning("Failed to set socket options", error=str(e))
+            sock.bind(addr)
+        except BaseException:
+            sock.close()
+            raise
+        
+        logger.info("UDP listener started", local_addr=sock.getsockname())
+        return sock
+    
+    def _start_reader(self, loop: asyncio.AbstractEventLoop,
+                      protocol: UDPProtocol) -> None:
+        """
+        Bind the UDP socket and drain it from a loop reader callback.
+        
+        Args:
+            loop: Event loop to register the reader with
+            protocol: Protocol handling the received datagrams
+        """
+        sock = self._bind_socket(protocol)
+        try:
+            sock.setblocking(False)
+            loop.add_reader(sock.fileno(), protocol.drain, sock)
+        except BaseException:
+            sock.close()
+            raise
+        
+        self._sock = sock
+        self._loop = loop
+    
+    def _start_thread(self, loop: asyncio.AbstractEventLoop,
+                      protocol: UDPProtocol) -> None:
+        """
+        Bind the UDP socket and read it from a dedicated receive thread.
+        
+        Args:
+            loop: Event loop the received datagrams are handed to
+            protocol: Protocol handling the received datagrams
+        """
+        sock = self._bind_socket(protocol)
+        # Never block in recv: the thread waits in select() instead. A socket
+        # timeout would make the drain below wait the full timeout once the
+        # queue is empty, even with MSG_DONTWAIT
+        sock.setblocking(False)
+        
+        self._sock = sock
+        self._loop = loop
+        self._thread_stop.clear()
+        self._pending = threading.Semaphore(RECV_THREAD_MAX_PENDING)
+        self._thread = threading.Thread(
+            target=self._receive_thread,
+            args=(sock, loop, protocol),
+            name="udp-receive",
+            daemon=True
+        )
+        self._thread.start()
+    
+    def _receive_thread(self, sock: socket.socket, loop: asyncio.AbstractEventLoop,
+                        protocol: UDPProtocol) -> None:
+        """
+        Receive datagrams and pass them to the event loop in batches.
+        
+        The GIL is released while waiting for the socket to become readable.
+        Once it is, everything already queued (up to udp_batch_size) is read
+        without blocking and delivered with a single loop wakeup.
+        
+        At most RECV_THREAD_MAX_PENDING batches wait on the loop at a time.
+        When the loop falls behind, new batches are dropped instead of
+        piling up in its ready queue; the drop count rides along with the
+        next batch that is handed over.
+        
+        Args:
+            sock: Bound non-blocking UDP socket
+            loop: Event loop running the protocol
+            protocol: Protocol handling the received datagrams
+        """
+        deliver = self._deliver
+        pending = self._pending
+        batch_size = self.settings.udp_batch_size
+        buf = bytearray(RECV_BUFFER_SIZE)
+        view = memoryview(buf)
+        dropped = 0
+        
+        with selectors.DefaultSelector() as selector:
+            selector.register(sock, selectors.EVENT_READ)
+            while not self._thread_stop.is_set():
+                batch: List[Tuple[bytes, tuple]] = []
+                if not selector.select(RECV_THREAD_POLL_INTERVAL):
+                    # Idle; still report drops not yet handed over
+                    if not dropped:
+                        continue
+                
+                while len(batch) < batch_size:
+                    try:
+                        nbytes, addr = sock.recvfrom_into(buf)
+                    except (BlockingIOError, InterruptedError):
+                        break
+                    except OSError as e:
+                        logger.error("UDP receive error", error=str(e))
+                        break
+                    batch.append((view[:nbytes].tobytes(), addr))
+                
+                if not batch and not dropped:
+                    continue
+                if not pending.acquire(blocking=False):
+                    dropped += len(batch)
+                    continue
+                try:
+                    loop.call_soon_threadsafe(deliver, protocol, batch, dropped)
+                except RuntimeError:
+                    # Event loop closed
+                    break
+                dropped = 0
+    
+    def _deliver(self, protocol: UDPProtocol, batch: List[Tuple[bytes, tuple]],
+                 dropped: int) -> None:
+        """
+        Handle a batch from the receive thread on the event loop.
+        
+        Args:
+            protocol: Protocol handling the received datagrams
+            batch: (data, sender address) pairs in arrival order
+            dropped: Datagrams the thread dropped since the previous batch
+        """
+        self._pending.release()
+        if dropped:
+            self._metrics.count_drop("rx", "UDP receive thread backlog full - dropping datagrams",
+                                     count=dropped,
+                                     max_pending_batches=RECV_THREAD_MAX_PENDING)
+        protocol.datagrams_received(batch)
+    
     async def stop(self) -> None:
         """Stop the UDP listener."""
         if not self._running:
@@ -189,6 +487,20 @@ class UDPListener:
             self.transport.close()
             self.transport = None
         
+        if self._thread:
+            self._thread_stop.set()
+            await asyncio.get_running_loop().run_in_executor(None, self._thread.join)
+            self._thread = None
+        elif self._sock and self._loop:
+            self._loop.remove_reader(self._sock.fileno())
+        
+        if self._sock:
+            self._sock.close()
+            self._sock = None
+        
+        # Push any drop counts not yet flushed
+        self._metrics.flush()
+        
         logger.info("UDP listener stopped")
     
     def is_running(self) -> bool:
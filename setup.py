@@ -1,8 +1,19 @@
+import os
 from setuptools import setup, find_packages
 
 with open("README.md", "r", encoding="utf-8") as fh:
     long_description = fh.read()
 
+# Optionally compile the per-message parse/convert modules with mypyc
+ext_modules = []
+if os.environ.get("GPGGA_COT_RELAY_MYPYC") == "1":
+    from mypyc.build import mypycify
+    ext_modules = mypycify([
+        "--follow-imports=silent",
+        "gpgga_cot_relay/gpgga_parser.py",
+        "gpgga_cot_relay/cot_converter.py",
+    ])
+
 setup(
     name="gpgga-cot-relay",
     version="1.0.0",
@@ -12,6 +23,7 @@ setup(
     long_description_content_type="text/markdown",
     url="https://github.com/yourusername/gpgga-cot-relay",
     packages=find_packages(),
+    ext_modules=ext_modules,
     classifiers=[
         "Programming Language :: Python :: 3",
         "License :: OSI Approved :: MIT License",
@@ -25,11 +37,13 @@ setup(
         "pydantic-settings>=2.1.0",
         "python-dotenv>=1.0.0",
         "structlog>=24.1.0",
+        "orjson>=3.9.0",
         "prometheus-client>=0.19.0",
+        "uvloop>=0.19.0; sys_platform != 'win32'",
     ],
     entry_points={
         "console_scripts": [
-            "gpgga-cot-relay=gpgga_cot_relay.__main__:main",
+            "gpgga-cot-relay=gpgga_cot_relay.__main__:run",
         ],
     },
 )
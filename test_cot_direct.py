@@ -3,24 +3,42 @@
 
 import socket
 import sys
-from datetime import datetime, timezone, timedelta
+import time
 
-def send_test_cot(host, port):
-    """Send a test CoT message directly."""
-    
-    # Create a simple CoT event
-    now = datetime.now(timezone.utc)
-    stale = now + timedelta(minutes=5)
-    
-    cot_xml = f'''<?xml version="1.0" encoding="UTF-8"?>
-<event version="2.0" uid="TEST-DIRECT-001" type="a-f-G-U-C" time="{now.isoformat()}Z" start="{now.isoformat()}Z" stale="{stale.isoformat()}Z" how="m-g">
-  <point lat="36.0" lon="-94.0" hae="100.0" ce="10.0" le="10.0"/>
+# Pre-encoded CoT event; fields are filled with bytes %-formatting
+_TEMPLATE = b'''<?xml version="1.0" encoding="UTF-8"?>
+<event version="2.0" uid="%s" type="a-f-G-U-C" time="%s" start="%s" stale="%s" how="m-g">
+  <point lat="%s" lon="%s" hae="%s" ce="10.0" le="10.0"/>
   <detail>
-    <contact callsign="DIRECT-TEST"/>
+    <contact callsign="%s"/>
     <remarks>Direct CoT test from GPGGA relay</remarks>
   </detail>
 </event>
 '''
+
+# Time is whole-second resolution, so the formatted value is cached per second
+_time_cache = [-1, b""]
+
+
+def _cot_time(sec):
+    """Format a Unix time (whole seconds) as a CoT UTC timestamp."""
+    if sec != _time_cache[0]:
+        _time_cache[:] = [sec, time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(sec)).encode()]
+    return _time_cache[1]
+
+
+def send_test_cot(host, port):
+    """Send a test CoT message directly."""
+    
+    # Create a simple CoT event, stale after 5 minutes
+    now = int(time.time())
+    now_str = _cot_time(now)
+    stale_str = time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(now + 300)).encode()
+    
+    cot_xml = _TEMPLATE % (
+        b"TEST-DIRECT-001", now_str, now_str, stale_str,
+        b"36.0", b"-94.0", b"100.0", b"DIRECT-TEST"
+    )
     
     print(f"Connecting to {host}:{port}...")
     
@@ -31,15 +49,14 @@ def send_test_cot(host, port):
         sock.connect((host, port))
         
         print("Connected! Sending CoT...")
-        print(f"CoT XML:\n{cot_xml}")
+        print(f"CoT XML:\n{cot_xml.decode('utf-8')}")
         
         # Send the CoT
-        sock.send(cot_xml.encode('utf-8'))
+        sock.sendall(cot_xml)
         
         print("CoT sent successfully!")
         
         # Keep connection open briefly
-        import time
         time.sleep(2)
         
         sock.close()
@@ -7,27 +7,30 @@ import socket
 import time
 import random
 import argparse
-from datetime import datetime
+from functools import reduce
+from operator import xor
+
+# Last formatted UTC time as [second, "HHMMSS.00"]; it only changes once a second
+_time_cache = [-1, ""]
 
 
 def calculate_checksum(sentence):
-    """Calculate NMEA checksum."""
+    """Calculate NMEA checksum of an ASCII sentence given as bytes."""
     # Remove $ if present
-    if sentence.startswith('$'):
+    if sentence.startswith(b'$'):
         sentence = sentence[1:]
     
-    checksum = 0
-    for char in sentence:
-        checksum ^= ord(char)
-    
-    return f"{checksum:02X}"
+    # XOR-reduce over the byte values (iterating bytes yields ints)
+    return f"{reduce(xor, sentence, 0):02X}"
 
 
 def generate_gpgga(device_id, lat=None, lon=None, alt=None):
     """Generate a valid GPGGA sentence with device ID."""
     # Current time
-    now = datetime.utcnow()
-    time_str = now.strftime("%H%M%S.00")
+    sec = int(time.time())
+    if sec != _time_cache[0]:
+        _time_cache[:] = [sec, time.strftime("%H%M%S.00", time.gmtime(sec))]
+    time_str = _time_cache[1]
     
     # Random or specified position
     if lat is None:
@@ -55,16 +58,18 @@ def generate_gpgga(device_id, lat=None, lon=None, alt=None):
     )
     
     # Calculate checksum
-    checksum = calculate_checksum(sentence)
+    checksum = calculate_checksum(sentence.encode('ascii'))
     
     # Complete sentence
     return f"${sentence}*{checksum}"
 
 
 def send_gpgga(host, port, device_id, count=1, interval=1.0, 
-               lat=None, lon=None, alt=None, movement=False):
+               lat=None, lon=None, alt=None, movement=False, verbose=False):
     """Send GPGGA messages to the relay."""
     sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sendto = sock.sendto
+    addr = (host, port)
     
     print(f"Sending {count} GPGGA messages to {host}:{port}")
     print(f"Device ID: {device_id}")
@@ -94,15 +99,71 @@ def send_gpgga(host, port, device_id, count=1, interval=1.0,
             current_alt if movement or alt else None
         )
         
-        sock.sendto(gpgga.encode(), (host, port))
+        sendto(gpgga.encode('ascii'), addr)
+        
+        # Printing costs far more than sending; only do it when asked
+        if verbose:
+            print(f"[{i+1}/{count}] Sent: {gpgga}")
+        
+        if interval > 0 and i < count - 1:
+            time.sleep(interval)
+    
+    sock.close()
+    print(f"\nDone! Sent {count} messages")
+
+
+def send_multi_device(host, port, num_devices, count=1, interval=1.0,
+                      lat=None, lon=None, alt=None, movement=False, verbose=False):
+    """Send GPGGA messages from many devices, one tick at a time."""
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sendto = sock.sendto
+    addr = (host, port)
+    
+    device_ids = [f"TEST{i+1:03d}" for i in range(num_devices)]
+    print(f"Sending {count} GPGGA messages per device to {host}:{port}")
+    print(f"Devices: {device_ids[0]} - {device_ids[-1]} ({num_devices})")
+    print(f"Interval: {interval}s")
+    if movement:
+        print("Movement simulation: ENABLED")
+    print()
+    
+    # Per-device [lat, lon, alt]
+    positions = [
+        [lat if lat else random.uniform(30.0, 45.0),
+         lon if lon else random.uniform(-120.0, -75.0),
+         alt if alt else random.uniform(100, 500)]
+        for _ in device_ids
+    ]
+    fixed = movement or lat, movement or lon, movement or alt
+    
+    for i in range(count):
+        # Build every device's sentence for this tick first...
+        batch = []
+        for device_id, position in zip(device_ids, positions):
+            if movement and i > 0:
+                position[0] += random.uniform(-0.001, 0.001)
+                position[1] += random.uniform(-0.001, 0.001)
+                position[2] += random.uniform(-10, 10)
+            batch.append(generate_gpgga(
+                device_id,
+                position[0] if fixed[0] else None,
+                position[1] if fixed[1] else None,
+                position[2] if fixed[2] else None
+            ).encode('ascii'))
+        
+        # ...then send them back to back
+        for sentence in batch:
+            sendto(sentence, addr)
         
-        print(f"[{i+1}/{count}] Sent: {gpgga}")
+        if verbose:
+            for sentence in batch:
+                print(f"[{i+1}/{count}] Sent: {sentence.decode('ascii')}")
         
-        if i < count - 1:
+        if interval > 0 and i < count - 1:
             time.sleep(interval)
     
     sock.close()
-    print("\nDone!")
+    print(f"\nDone! Sent {count * num_devices} messages")
 
 
 def main():
@@ -167,6 +228,12 @@ def main():
         help='Simulate device movement'
     )
     
+    parser.add_argument(
+        '-v', '--verbose',
+        action='store_true',
+        help='Print every message sent'
+    )
+    
     parser.add_argument(
         '--multi-device',
         type=int,
@@ -176,25 +243,20 @@ def main():
     args = parser.parse_args()
     
     if args.multi_device:
-        # Simulate multiple devices
-        for i in range(args.multi_device):
-            device_id = f"TEST{i+1:03d}"
-            print(f"\n=== Simulating device {device_id} ===")
-            send_gpgga(
-                args.host, args.port, device_id, 
-                args.count, args.interval,
-                args.lat, args.lon, args.alt,
-                args.movement
-            )
-            if i < args.multi_device - 1:
-                time.sleep(0.5)  # Brief pause between devices
+        # Simulate multiple devices, all reporting each tick
+        send_multi_device(
+            args.host, args.port, args.multi_device,
+            args.count, args.interval,
+            args.lat, args.lon, args.alt,
+            args.movement, args.verbose
+        )
     else:
         # Single device
         send_gpgga(
             args.host, args.port, args.device_id,
             args.count, args.interval,
             args.lat, args.lon, args.alt,
-            args.movement
+            args.movement, args.verbose
         )
 
 
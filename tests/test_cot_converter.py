@@ -0,0 +1,111 @@
+"""Tests for the CoT converter."""
+
+import random
+import uuid
+import xml.etree.ElementTree as ET
+from datetime import datetime, time, timezone
+
+import pytest
+
+from gpgga_cot_relay.config import Settings
+from gpgga_cot_relay.cot_converter import CoTConverter, _format_cot_time
+from gpgga_cot_relay.gpgga_parser import GPGGAData
+
+
+# Element tag -> attribute names, as produced by the original ElementTree builder
+BASELINE_ATTRIBUTES = {
+    "event": {"version", "uid", "type", "time", "start", "stale", "how"},
+    "point": {"lat", "lon", "hae", "ce", "le"},
+    "detail": set(),
+    "contact": {"callsign"},
+    "precisionlocation": {"altsrc", "geopointsrc"},
+    "track": {"course", "speed"},
+    "__gps": {"numSats", "hdop", "fixQuality", "fixQualityDesc"},
+    "__device": {"uid", "type"},
+    "remarks": set(),
+}
+
+
+def make_data(device_id: str = "DEV001", fix_quality: int = 1) -> GPGGAData:
+    """GPGGA data as parsed from a typical sentence."""
+    return GPGGAData(time(12, 35, 19, 500000), 48.1173, -11.516666666666667,
+                     fix_quality, 8, 0.9, 545.4, 46.9, None, None, device_id)
+
+
+def convert(data: GPGGAData) -> ET.Element:
+    """Convert to CoT and parse the resulting XML."""
+    cot = CoTConverter(Settings()).convert(data)
+
+    assert cot is not None and cot.endswith(b"\n")
+    return ET.fromstring(cot)
+
+
+def test_convert_matches_baseline_structure():
+    event = convert(make_data())
+
+    assert event.tag == "event"
+    assert [child.tag for child in event] == ["point", "detail"]
+    assert [child.tag for child in event.find("detail")] == [
+        "contact", "precisionlocation", "track", "__gps", "__device", "remarks",
+    ]
+    for element in event.iter():
+        assert set(element.attrib) == BASELINE_ATTRIBUTES[element.tag], element.tag
+
+
+def test_convert_values():
+    data = make_data()
+    event = convert(data)
+    point = event.find("point")
+    detail = event.find("detail")
+
+    assert event.get("version") == "2.0"
+    assert event.get("type") == Settings().device_type
+    assert event.get("how") == "h-gps"
+    assert event.get("start") == event.get("time")
+    assert point.get("lat") == str(data.latitude)
+    assert point.get("lon") == str(data.longitude)
+    assert point.get("hae") == str(data.altitude)
+    assert point.get("ce") == point.get("le") == str(5.0 * 0.9)
+    assert detail.find("contact").get("callsign") == "DEV001"
+    assert detail.find("__gps").attrib == {
+        "numSats": "8", "hdop": "0.9", "fixQuality": "1", "fixQualityDesc": "GPS fix",
+    }
+    assert detail.find("__device").attrib == {"uid": "DEV001", "type": "GPS Tracker"}
+    assert detail.find("remarks").text == "GPGGA Device: DEV001, GPS Time: 12:35:19.500000"
+
+
+def test_convert_without_fix_omits_track():
+    event = convert(make_data(fix_quality=0))
+
+    assert event.find("detail/track") is None
+    assert event.get("how") == "h-g-i-g-o"
+
+
+@pytest.mark.parametrize("device_id", ['A&B', 'A<B>', 'say "hi"', "it's", "&amp;"])
+def test_convert_escapes_device_id(device_id):
+    event = convert(make_data(device_id))
+    detail = event.find("detail")
+
+    assert detail.find("contact").get("callsign") == device_id
+    assert detail.find("__device").get("uid") == device_id
+    assert detail.find("remarks").text.startswith(f"GPGGA Device: {device_id},")
+
+
+@pytest.mark.parametrize("device_id", ["DEV001", "TEST042", "", "A&B", "ünï", "x" * 200])
+def test_device_uid_matches_uuid5(device_id):
+    namespace = uuid.UUID("6ba7b810-9dad-11d1-80b4-00c04fd430c8")
+    expected = uuid.uuid5(namespace, f"gpgga-device-{device_id}")
+
+    uid, _ = CoTConverter(Settings())._get_device_uid(device_id)
+
+    assert uid == f"GPGGA-{expected}"
+
+
+@pytest.mark.parametrize("timestamp", [
+    0.0, 1.5, 86399.9999996, 951782400.000001, 1700000000.123456,
+    1760527800.9999999, 4102444799.999999,
+] + [random.Random(seed).uniform(0, 4102444800) for seed in range(50)])
+def test_format_cot_time_matches_strftime(timestamp):
+    expected = datetime.fromtimestamp(timestamp, timezone.utc).strftime("%Y-%m-%dT%H:%M:%S.%fZ")
+
+    assert _format_cot_time(timestamp) == expected
@@ -0,0 +1,120 @@
+"""Tests for the GPGGA parser."""
+
+from datetime import time
+from functools import reduce
+from operator import xor
+
+import pytest
+
+from gpgga_cot_relay.config import Settings
+from gpgga_cot_relay.cot_converter import CoTConverter
+from gpgga_cot_relay.gpgga_parser import GPGGAParser
+
+
+VALID_BODY = b"GPGGA,123519.50,4807.038,N,01131.000,W,1,08,0.9,545.4,M,46.9,M,,,DEV001"
+
+
+def sentence(body: bytes) -> bytes:
+    """Wrap a sentence body with '$' and a valid checksum."""
+    return b"$%s*%02X" % (body, reduce(xor, body, 0))
+
+
+def with_field(index: int, value: bytes) -> bytes:
+    """Valid sentence with one comma-separated body field replaced."""
+    fields = VALID_BODY.split(b",")
+    fields[index] = value
+    return sentence(b",".join(fields))
+
+
+def test_parse_valid_sentence():
+    data = GPGGAParser.parse(sentence(VALID_BODY) + b"\r\n")
+
+    assert data is not None
+    assert data.device_id == "DEV001"
+    assert data.timestamp == time(12, 35, 19, 500000)
+    assert data.latitude == 48.1173
+    assert data.longitude == -11.516666666666667
+    assert data.fix_quality == 1
+    assert data.num_satellites == 8
+    assert data.hdop == 0.9
+    assert data.altitude == 545.4
+    assert data.geoid_separation == 46.9
+    assert data.dgps_time is None
+    assert data.dgps_station_id is None
+
+
+def test_parse_optional_fields_empty():
+    data = GPGGAParser.parse(with_field(8, b""))
+
+    assert data is not None
+    assert data.hdop == 0.0
+
+
+@pytest.mark.parametrize("value,expected", [
+    (b"", None),
+    (b"123519", time(12, 35, 19)),
+    (b"123519.5", time(12, 35, 19, 500000)),
+])
+def test_parse_time_field(value, expected):
+    data = GPGGAParser.parse(with_field(1, value))
+
+    assert data is not None
+    assert data.timestamp == expected
+
+
+def test_coordinates_render_like_baseline():
+    data = GPGGAParser.parse(sentence(VALID_BODY))
+
+    cot = CoTConverter(Settings()).convert(data)
+
+    # Minutes decoded from their own digits, no float subtraction noise
+    assert b' lat="48.1173" lon="-11.516666666666667" ' in cot
+
+
+def test_parse_coordinate_limits():
+    data = GPGGAParser.parse(with_field(4, b"18000.000"))
+
+    assert data is not None
+    assert data.longitude == -180.0
+
+
+def test_parse_negative_altitude():
+    data = GPGGAParser.parse(with_field(9, b"-12.5"))
+
+    assert data is not None
+    assert data.altitude == -12.5
+
+
+@pytest.mark.parametrize("raw", [
+    b"",
+    b"GPGGA",
+    sentence(VALID_BODY)[:-2] + b"00",                  # bad checksum
+    sentence(VALID_BODY)[:-3],                          # no checksum
+    sentence(VALID_BODY.replace(b"GPGGA", b"GPRMC")),   # other sentence
+    sentence(VALID_BODY.rsplit(b",", 1)[0]),            # no device ID
+    sentence(VALID_BODY + b",extra"),                   # too many fields
+    sentence(VALID_BODY.replace(b"DEV001", b"DEV\xe9")),  # non-ASCII
+])
+def test_parse_rejects_malformed_sentence(raw):
+    assert GPGGAParser.parse(raw) is None
+
+
+@pytest.mark.parametrize("index,value", [
+    (1, b"12a"), (1, b"garbage"), (1, b"99"), (1, b"1234567.1"), (1, b"123456."),
+    (1, b"123456.5x"),
+    (2, b"4807"), (2, b".5"), (2, b"1."), (2, b"9999999"), (2, b"9001.0"),
+    (2, b"9" * 400 + b".0"),
+    (2, b"nan"), (2, b"inf"), (2, b"-inf"), (2, b"1e2"), (2, b"4_807.038"),
+    (2, b"-4807.038"), (2, b""),
+    (4, b"nan"), (4, b"1e3"), (4, b"99999.9"), (4, b"18001.0"), (4, b"01131"),
+    (3, b"X"), (5, b"X"),
+    (6, b"9"), (6, b"x"), (6, b"+1"), (7, b"-1"), (7, b"1_0"),
+    (8, b"1e2"), (8, b"nan"),
+    (9, b"nan"), (9, b"inf"), (9, b"1_000.5"), (9, b"1e2"), (9, b""),
+    (9, b"9" * 400),
+    (10, b"F"), (10, b""),
+    (11, b"nan"),
+    (14, b"*"), (15, b""), (15, b"*x"),
+])
+def test_parse_rejects_malformed_field(index, value):
+    assert GPGGAParser.parse(with_field(index, value)) is None
@@ -0,0 +1,83 @@
+"""Tests for logging helpers."""
+
+import pytest
+from prometheus_client import Counter, Gauge, Info
+from structlog.testing import capture_logs
+
+from gpgga_cot_relay import logging_config
+from gpgga_cot_relay.logging_config import ErrorHandler, _collector, _error_fields
+
+
+class FakeClock:
+    """Stand-in for time.monotonic that only moves when told to."""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(logging_config.time, "monotonic", fake)
+    return fake
+
+
+def test_burst_tail_is_reported_when_window_ends(clock):
+    handler = ErrorHandler()
+    with capture_logs() as logs:
+        for _ in range(5):
+            handler.handle_send_error("DEV001", ConnectionError("refused"))
+        handler.flush_suppressed()
+        clock.now += logging_config.ERROR_LOG_WINDOW
+        handler.flush_suppressed()
+        handler.flush_suppressed()
+
+    assert [log["event"] for log in logs] == ["TAK send error", "Similar errors suppressed"]
+    assert logs[1]["suppressed"] == 4
+    assert logs[1]["kind"] == "send"
+    assert logs[1]["error"] == "refused"
+    assert logs[1]["error_type"] == "ConnectionError"
+
+
+def test_error_after_flushed_window_is_logged_in_full(clock):
+    handler = ErrorHandler()
+    with capture_logs() as logs:
+        handler.handle_send_error("DEV001", ConnectionError("refused"))
+        handler.handle_send_error("DEV001", ConnectionError("refused"))
+        clock.now += logging_config.ERROR_LOG_WINDOW
+        handler.flush_suppressed()
+        handler.handle_send_error("DEV001", ConnectionError("refused"))
+
+    assert [log["event"] for log in logs] == [
+        "TAK send error", "Similar errors suppressed", "TAK send error",
+    ]
+    assert "suppressed" not in logs[2]
+
+
+def test_error_fields_are_read_only():
+    fields = _error_fields("ValueError", "bad")
+
+    with pytest.raises(TypeError):
+        fields["error"] = "corrupted"
+    assert _error_fields("ValueError", "bad")["error"] == "bad"
+
+
+@pytest.mark.parametrize("metric_cls,name", [
+    (Counter, "test_collector_reuse_total"),
+    (Gauge, "test_collector_reuse_gauge"),
+    (Info, "test_collector_reuse_app"),
+])
+def test_collector_reuses_registered_metric(metric_cls, name):
+    first = _collector(metric_cls, name, "Reused")
+
+    assert _collector(metric_cls, name, "Reused") is first
+
+
+def test_collector_rejects_name_taken_by_other_type():
+    _collector(Gauge, "test_collector_clash_total", "Gauge")
+
+    with pytest.raises(ValueError):
+        _collector(Counter, "test_collector_clash_total", "Counter")
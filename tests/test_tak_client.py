@@ -0,0 +1,93 @@
+"""Tests for the TAK client send buffer."""
+
+import asyncio
+
+from structlog.testing import capture_logs
+
+from gpgga_cot_relay.config import Settings
+from gpgga_cot_relay.logging_config import COT_DROPPED, MetricsBuffer
+from gpgga_cot_relay.tak_client_simple import SimpleTAKClient
+
+
+def test_full_buffer_drops_oldest_and_batches_metrics():
+    async def fill() -> SimpleTAKClient:
+        client = SimpleTAKClient(Settings(message_queue_size=100), metrics)
+        # Pretend to be connected without starting the network tasks
+        client._running = client._connected = True
+        for i in range(150):
+            assert await client.send_cot(b"<event %d/>\n" % i)
+        return client
+
+    metrics = MetricsBuffer()
+    before = COT_DROPPED._value.get()
+    client = asyncio.run(fill())
+
+    assert client.messages_dropped == 50
+    assert client._tx_buffer[0] == b"<event 50/>\n"
+    # Drops are counted locally until the owner flushes
+    assert metrics.tx_dropped == 50
+    assert COT_DROPPED._value.get() == before
+
+    metrics.flush()
+
+    assert metrics.tx_dropped == 0
+    assert COT_DROPPED._value.get() == before + 50
+
+
+class FakeWriter:
+    """StreamWriter stand-in recording writes, optionally failing drain()."""
+
+    def __init__(self, fail: bool = False):
+        self.fail = fail
+        self.written = []
+
+    def writelines(self, lines):
+        self.written.extend(lines)
+
+    async def drain(self):
+        if self.fail:
+            raise ConnectionResetError("peer closed")
+
+
+async def send_through_sender(writer, connected: bool, count: int) -> MetricsBuffer:
+    """Queue count messages and let the sender task write them."""
+    metrics = MetricsBuffer()
+    client = SimpleTAKClient(Settings(), metrics)
+    client._running = client._connected = True
+    for i in range(count):
+        await client.send_cot(b"<event %d/>\n" % i)
+    client._writer = writer
+    client._connected = connected
+    sender = asyncio.create_task(client._sender())
+    await asyncio.sleep(0.01)
+    sender.cancel()
+    return metrics
+
+
+def test_sent_is_counted_after_write():
+    writer = FakeWriter()
+    metrics = asyncio.run(send_through_sender(writer, True, 3))
+
+    assert len(writer.written) == 3
+    assert (metrics.sent, metrics.send_errors) == (3, 0)
+
+
+def test_failed_or_disconnected_sends_are_errors():
+    failed = asyncio.run(send_through_sender(FakeWriter(fail=True), True, 3))
+    disconnected = asyncio.run(send_through_sender(None, False, 3))
+
+    assert (failed.sent, failed.send_errors) == (0, 3)
+    assert (disconnected.sent, disconnected.send_errors) == (0, 3)
+
+
+def test_drop_warning_is_logged_once_per_flush_window():
+    metrics = MetricsBuffer()
+
+    with capture_logs() as logs:
+        for _ in range(5):
+            metrics.count_drop("tx", "dropping")
+        metrics.flush()
+        metrics.count_drop("tx", "dropping")
+
+    assert [log["event"] for log in logs] == ["dropping", "dropping"]
+    assert metrics.tx_dropped == 1
@@ -0,0 +1,120 @@
+"""Tests for the UDP listener."""
+
+import asyncio
+import socket
+import sys
+import time
+
+import pytest
+
+from gpgga_cot_relay import udp_listener
+from gpgga_cot_relay.config import Settings
+from gpgga_cot_relay.logging_config import MetricsBuffer
+from gpgga_cot_relay.udp_listener import UDPListener, UDPProtocol
+from tests.test_gpgga_parser import VALID_BODY, sentence
+
+
+def free_udp_port() -> int:
+    """Pick a currently unused local UDP port."""
+    with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+async def receive_latencies(threaded: bool, count: int) -> list:
+    """Send datagrams one at a time and time each hand-off to the handler."""
+    settings = Settings(udp_listen_host="127.0.0.1",
+                        udp_listen_port=free_udp_port(),
+                        udp_threaded_receive=threaded)
+    received = asyncio.Queue()
+    listener = UDPListener(settings,
+                           lambda data, addr: received.put_nowait(time.perf_counter()))
+    await listener.start()
+    latencies = []
+    try:
+        with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sender:
+            for _ in range(count):
+                sent = time.perf_counter()
+                sender.sendto(sentence(VALID_BODY), ("127.0.0.1", settings.udp_listen_port))
+                latencies.append(await asyncio.wait_for(received.get(), 5) - sent)
+    finally:
+        await listener.stop()
+
+    assert listener.get_stats()["messages_received"] == count
+    return latencies
+
+
+@pytest.mark.parametrize("threaded", [False, True])
+def test_datagrams_are_delivered_promptly(threaded):
+    latencies = asyncio.run(receive_latencies(threaded, 5))
+
+    # Well under RECV_THREAD_POLL_INTERVAL
+    assert max(latencies) < 0.1
+
+
+@pytest.mark.parametrize("framing", [b"", b"\r\n", b" ", b"\n\n"])
+def test_framing_whitespace_is_ignored(framing):
+    handled = []
+    protocol = UDPProtocol(lambda data, addr: handled.append(data))
+
+    protocol.datagram_received(framing + sentence(VALID_BODY) + b"\r\n", ("127.0.0.1", 1))
+
+    assert len(handled) == 1
+    assert protocol.get_stats()["parse_errors"] == 0
+
+
+class ClampingSocket:
+    """Socket stand-in applying Linux SO_RCVBUF semantics without CAP_NET_ADMIN."""
+
+    def __init__(self, rmem_max: int):
+        self.rmem_max = rmem_max
+        self.rcvbuf = 0
+
+    def setsockopt(self, level, option, value):
+        if option == getattr(socket, "SO_RCVBUFFORCE", None):
+            raise PermissionError("CAP_NET_ADMIN required")
+        self.rcvbuf = 2 * min(value, self.rmem_max)
+
+    def getsockopt(self, level, option):
+        return self.rcvbuf
+
+
+@pytest.mark.skipif(not sys.platform.startswith("linux"), reason="Linux SO_RCVBUF semantics")
+@pytest.mark.parametrize("rmem_max,clamped", [(8 << 20, True), (16 << 20, False)])
+def test_clamped_receive_buffer_is_reported(monkeypatch, rmem_max, clamped):
+    warnings = []
+    monkeypatch.setattr(udp_listener.logger, "warning",
+                        lambda event, **kw: warnings.append(event))
+    protocol = UDPProtocol(lambda data, addr: None, rcvbuf_size=12 << 20)
+
+    protocol._set_receive_buffer(ClampingSocket(rmem_max))
+
+    assert bool(warnings) == clamped
+
+
+def test_threaded_receive_drops_when_loop_falls_behind():
+    async def overload() -> tuple:
+        settings = Settings(udp_listen_host="127.0.0.1",
+                            udp_listen_port=free_udp_port(),
+                            udp_threaded_receive=True,
+                            udp_batch_size=1)
+        metrics = MetricsBuffer()
+        listener = UDPListener(settings, lambda data, addr: None, metrics)
+        await listener.start()
+        try:
+            with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sender:
+                for _ in range(count):
+                    sender.sendto(sentence(VALID_BODY), ("127.0.0.1", settings.udp_listen_port))
+            # Block the loop so the receive thread runs into its pending limit
+            time.sleep(0.5)
+            # Leftover drops are reported once the thread next goes idle
+            await asyncio.sleep(2 * udp_listener.RECV_THREAD_POLL_INTERVAL)
+            return listener.get_stats()["messages_received"], metrics.rx_dropped
+        finally:
+            await listener.stop()
+
+    count = 300
+    received, dropped = asyncio.run(overload())
+
+    assert received == udp_listener.RECV_THREAD_MAX_PENDING
+    assert received + dropped == count